@@ -1,16 +1,19 @@
 """
 Django settings for class_management project.
+
+Requiert Django 5.1 ou plus (voir requirements.txt).
 """
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
 # Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
+# See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-your-secret-key-here'
@@ -41,7 +44,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.roles.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # Avant toute lecture du corps des envois de projet (voir core.intake)
+    'core.intake.SubmissionIntakeMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -58,6 +64,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.roles.role_context',
             ],
         },
     },
@@ -67,18 +74,78 @@ WSGI_APPLICATION = 'class_management.wsgi.application'
 
 
 # Database
-# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+#
+# DJANGO_DB_ENGINE=sqlite (défaut) ou postgresql. Voir `manage.py benchmark_db`
+# pour comparer les deux sur les écritures de l'application.
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    # Nécessite psycopg (pip install "psycopg[binary]", "psycopg[pool]" pour DJANGO_DB_POOL)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'class_management'),
+            'USER': os.environ.get('POSTGRES_USER', 'class_management'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Connexions persistantes, vérifiées avant d'être réutilisées
+            'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DJANGO_DB_POOL') == '1':
+        # Pool psycopg partagé par les threads du processus (incompatible avec CONN_MAX_AGE)
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN', 2)),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX', 10)),
+        }
+else:
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('DJANGO_SQLITE_BUSY_TIMEOUT', 20))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Les processus de `run_jobs` écrivent en parallèle : prendre le verrou
+                # d'écriture dès le début des transactions et patienter s'il est occupé.
+                'timeout': SQLITE_BUSY_TIMEOUT,
+                'transaction_mode': 'IMMEDIATE',
+                # Appliqué à chaque connexion. WAL : les lectures ne bloquent plus
+                # l'écriture ; synchronous=NORMAL suffit en WAL (pas de corruption,
+                # seules les dernières transactions peuvent être perdues sur coupure).
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    f"PRAGMA synchronous={os.environ.get('DJANGO_SQLITE_SYNCHRONOUS', 'NORMAL')};"
+                    f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT * 1000};'
+                ),
+            },
+        }
+    }
 
-DATABASES = {
+
+# Cache
+# Partagé entre processus : les invalidations (rôles, statistiques) sont vues par tous les workers.
+# Au-delà de MAX_ENTRIES, des entrées sont évincées au hasard ; une version de rôle ou
+# de statistiques absente provoque un rechargement (voir core.roles et core.stats).
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'class_management_cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('DJANGO_CACHE_MAX_ENTRIES', 5000)),
+        },
     }
 }
 
 
 # Password validation
-# https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
+# https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -97,7 +164,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 
 # Internationalization
-# https://docs.djangoproject.com/en/4.2/topics/i18n/
+# https://docs.djangoproject.com/en/5.1/topics/i18n/
 
 LANGUAGE_CODE = 'fr-fr'
 
@@ -109,7 +176,7 @@ USE_TZ = True
 
 
 # Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/4.2/howto/static-files/
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [
@@ -120,8 +187,11 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# La feuille de présence poste un champ par étudiant présent
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
+
 # Default primary key field type
-# https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
+# https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -135,4 +205,22 @@ LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 
 # Email settings (for development)
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = os.environ.get('DJANGO_DEFAULT_FROM_EMAIL', 'noreply@class-management.local')
+
+# Alertes d'absence envoyées par `manage.py send_notifications`
+ABSENCE_ALERTS_ENABLED = os.environ.get('ABSENCE_ALERTS_ENABLED', '1') == '1'
+
+# Exports PDF (`manage.py run_jobs`) : cache des listes de présence rendues
+# et nombre de processus de rendu par export (vide : un par cœur)
+ATTENDANCE_PDF_CACHE_DIR = MEDIA_ROOT / 'cache' / 'attendance_pdf'
+ATTENDANCE_EXPORT_WORKERS = int(os.environ['ATTENDANCE_EXPORT_WORKERS']) if os.environ.get('ATTENDANCE_EXPORT_WORKERS') else None
+
+# Téléversements par morceaux : fichiers partiels en cours de réception
+CHUNKED_UPLOAD_DIR = MEDIA_ROOT / 'uploads' / 'partial'
+
+# Envois de projet mis en file avant `manage.py drain_submissions`, et
+# envois reçus simultanément, au total et par étudiant
+SUBMISSION_SPOOL_DIR = MEDIA_ROOT / 'spool' / 'submissions'
+SUBMISSION_MAX_CONCURRENT = 16
+SUBMISSION_MAX_CONCURRENT_PER_USER = 1
\ No newline at end of file
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     UserProfile, Subject, Student, WorkGroup, AttendanceSession, 
-    Attendance, Project, ProjectSubmission, DirectorComment
+    Attendance, AttendanceSummary, Project, ProjectSubmission, DirectorComment, Job,
+    Notification, StoredFile, UploadSession
 )
 
 
@@ -37,6 +38,7 @@ class AttendanceSessionAdmin(admin.ModelAdmin):
     list_display = ['subject', 'date', 'start_time', 'end_time', 'created_by']
     list_filter = ['subject', 'date', 'created_by']
     date_hierarchy = 'date'
+    readonly_fields = ['present_count', 'total_count', 'comment_count']
 
 
 @admin.register(Attendance)
@@ -63,4 +65,40 @@ class ProjectSubmissionAdmin(admin.ModelAdmin):
 @admin.register(DirectorComment)
 class DirectorCommentAdmin(admin.ModelAdmin):
     list_display = ['attendance_session', 'created_by', 'created_at']
-    list_filter = ['created_at', 'created_by']
\ No newline at end of file
+    list_filter = ['created_at', 'created_by']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'status', 'progress', 'total', 'attempts', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+    readonly_fields = ['payload', 'result', 'error']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'project', 'student', 'received', 'size', 'created_at', 'completed_at']
+    list_filter = ['completed_at']
+    search_fields = ['filename', 'student__last_name', 'project__title']
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'ref_count', 'updated_at']
+    list_filter = ['updated_at']
+    search_fields = ['name']
+
+
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['student', 'subject', 'present', 'absent']
+    list_filter = ['subject']
+    search_fields = ['student__last_name', 'student__student_id']
+    readonly_fields = ['present', 'absent']
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['recipient']
@@ -0,0 +1,188 @@
+from django.db import transaction
+from django.db.models import F, OuterRef, Q
+from django.utils import timezone
+
+from .filieres import resolve_filiere
+from .models import Attendance, AttendanceSession, DirectorComment, Student
+from .stats import SubqueryCount
+from .summaries import ensure_summaries, shift_summaries
+
+
+ROSTER_CHOICES = [
+    ('all', 'Tous les étudiants'),
+    ('filiere', 'Une filière'),
+    ('group', 'Un groupe de travail'),
+]
+
+
+def filter_director_sessions(params):
+    """Sessions vues par le directeur, filtrées par `params` (GET ou charge utile d'une tâche)."""
+    sessions = AttendanceSession.objects.all().order_by('-date', '-start_time', 'id')
+
+    subject_filter = params.get('subject')
+    date_filter = params.get('date')
+
+    if subject_filter:
+        sessions = sessions.filter(subject_id=subject_filter)
+    if date_filter:
+        sessions = sessions.filter(date=date_filter)
+    if params.get('pending') == 'true':
+        sessions = sessions.filter(comment_count=0)
+
+    return sessions
+
+
+def roster_student_ids(roster='all', filiere=None, work_group=None):
+    """Identifiants des étudiants inscrits sur la liste d'appel choisie."""
+    if roster == 'filiere':
+        students = Student.objects.filter(filiere=filiere)
+    elif roster == 'group':
+        students = work_group.students.all()
+    else:
+        students = Student.objects.all()
+    return students.order_by().values_list('id', flat=True)
+
+
+def session_roster(session, filiere=None, search=None, present=None):
+    """Présences de la session, filtrables par filière, nom/numéro et état."""
+    attendances = Attendance.objects.filter(session=session).select_related('student')
+    if filiere:
+        attendances = attendances.filter(student__filiere=resolve_filiere(filiere) or filiere)
+    if search:
+        attendances = attendances.filter(
+            Q(student__last_name__icontains=search)
+            | Q(student__first_name__icontains=search)
+            | Q(student__student_id__icontains=search)
+        )
+    if present is not None:
+        attendances = attendances.filter(is_present=present)
+    return attendances.order_by('student__last_name', 'student__first_name', 'id')
+
+
+def touch_session(session_id, present=0, total=0):
+    """
+    Change la version de la session (invalide notamment le PDF en cache) et
+    décale ses compteurs de présence, dans la même requête UPDATE.
+    """
+    values = {'updated_at': timezone.now()}
+    if present:
+        values['present_count'] = F('present_count') + present
+    if total:
+        values['total_count'] = F('total_count') + total
+    AttendanceSession.objects.filter(id=session_id).update(**values)
+
+
+def touch_student_sessions(student_ids):
+    """Nouvelle version des sessions où figurent ces étudiants (nom ou filière modifiés)."""
+    return AttendanceSession.objects.filter(
+        id__in=Attendance.objects.filter(student_id__in=student_ids).values('session_id')
+    ).update(updated_at=timezone.now())
+
+
+def create_session_roster(session, student_ids, batch_size=1000):
+    """Crée toutes les présences (absent par défaut) de la session en un seul INSERT par lot."""
+    student_ids = list(student_ids)
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            [Attendance(session=session, student_id=student_id, is_present=False) for student_id in student_ids],
+            batch_size=batch_size,
+        )
+        # Bilans : une absence de plus pour chaque inscrit
+        ensure_summaries(session.subject_id, student_ids, batch_size=batch_size)
+        for i in range(0, len(student_ids), batch_size):
+            shift_summaries(session.subject_id, student_ids[i:i + batch_size], absent=1)
+        touch_session(session.id, total=len(student_ids))
+
+
+def _flip_in_batches(session, queryset, ids, is_present, batch_size=500):
+    ids = list(ids)
+    shift = 1 if is_present else -1
+    updated = 0
+    for i in range(0, len(ids), batch_size):
+        # Lignes verrouillées d'abord : un pointage concurrent de la même ligne attend,
+        # puis ne la retrouve plus dans l'état de départ. Seules les lignes réellement
+        # modifiées décalent les bilans.
+        changed = list(
+            queryset.filter(id__in=ids[i:i + batch_size]).select_for_update().values_list('id', 'student_id')
+        )
+        if not changed:
+            continue
+        Attendance.objects.filter(id__in=[attendance_id for attendance_id, _ in changed]).update(
+            is_present=is_present
+        )
+        shift_summaries(
+            session.subject_id, [student_id for _, student_id in changed], present=shift, absent=-shift
+        )
+        updated += len(changed)
+    return updated
+
+
+def apply_attendance_states(session, present_ids=(), absent_ids=()):
+    """
+    Marque `present_ids` présents et `absent_ids` absents dans la session.
+
+    Seules les lignes dont l'état change sont écrites, en deux UPDATE ... WHERE id IN.
+    Retourne le nombre de présences modifiées.
+    """
+    attendances = Attendance.objects.filter(session=session)
+    with transaction.atomic():
+        marked_present = _flip_in_batches(session, attendances.filter(is_present=False), present_ids, True)
+        marked_absent = _flip_in_batches(session, attendances.filter(is_present=True), absent_ids, False)
+        if marked_present or marked_absent:
+            touch_session(session.id, present=marked_present - marked_absent)
+    return marked_present + marked_absent
+
+
+def save_attendance_changes(session, present_ids):
+    """Applique l'état complet posté (`present_ids` = présences cochées) à la session."""
+    present_ids = set(present_ids)
+    to_present = []
+    to_absent = []
+    rows = Attendance.objects.filter(session=session).values_list('id', 'is_present')
+    for attendance_id, is_present in rows:
+        if attendance_id in present_ids and not is_present:
+            to_present.append(attendance_id)
+        elif attendance_id not in present_ids and is_present:
+            to_absent.append(attendance_id)
+    return apply_attendance_states(session, to_present, to_absent)
+
+
+def parse_present_ids(data, prefix='present_'):
+    """Identifiants des champs `present_<id>` cochés dans un formulaire."""
+    present_ids = set()
+    for key, value in data.items():
+        if key.startswith(prefix) and value == 'on':
+            try:
+                present_ids.add(int(key[len(prefix):]))
+            except ValueError:
+                continue
+    return present_ids
+
+
+def _session_counts():
+    return {
+        'real_present': SubqueryCount(Attendance.objects.filter(session=OuterRef('pk'), is_present=True).values('pk')),
+        'real_total': SubqueryCount(Attendance.objects.filter(session=OuterRef('pk')).values('pk')),
+        'real_comments': SubqueryCount(DirectorComment.objects.filter(attendance_session=OuterRef('pk')).values('pk')),
+    }
+
+
+def session_counter_drift():
+    """Sessions dont les compteurs diffèrent d'un recomptage (une seule requête)."""
+    return AttendanceSession.objects.annotate(**_session_counts()).exclude(
+        present_count=F('real_present'), total_count=F('real_total'), comment_count=F('real_comments'),
+    ).order_by('id')
+
+
+def repair_session_counters(session_ids, batch_size=500):
+    """Recompte les sessions données, un UPDATE avec sous-requêtes par lot."""
+    counts = _session_counts()
+    session_ids = list(session_ids)
+    repaired = 0
+    for i in range(0, len(session_ids), batch_size):
+        repaired += AttendanceSession.objects.filter(id__in=session_ids[i:i + batch_size]).update(
+            present_count=counts['real_present'],
+            total_count=counts['real_total'],
+            comment_count=counts['real_comments'],
+        )
+    return repaired
@@ -0,0 +1,178 @@
+import csv
+import os
+import zipfile
+
+import openpyxl
+
+from django.utils.text import get_valid_filename
+
+from .models import Attendance, AttendanceSession, ProjectSubmission, Student
+
+
+EXPORT_READ_BLOCK = 64 * 1024
+MATRIX_CHUNK_SIZE = 2000
+
+
+class _ZipStream:
+    """Tampon en écriture seule : zipfile y écrit, le générateur vide au fur et à mesure."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """Génère les octets d'une archive ZIP à partir de (nom, chemin) sans tout charger en mémoire."""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for arcname, path in entries:
+            # ZIP64 : un membre peut dépasser 2 Gio, sa taille n'est connue qu'à la fin
+            with open(path, 'rb') as source, archive.open(arcname, 'w', force_zip64=True) as target:
+                while True:
+                    block = source.read(EXPORT_READ_BLOCK)
+                    if not block:
+                        break
+                    target.write(block)
+                    yield stream.pop()
+            yield stream.pop()
+    yield stream.pop()
+
+
+def session_archive_name(session):
+    return f"{session.date}_{session.subject.code}_{session.id}.pdf"
+
+
+def submission_archive_name(submission, group_name=None):
+    """`<groupe>/<Nom_Prénom_numéro><ext>`, ou sans dossier pour un projet individuel."""
+    student = submission.student
+    ext = os.path.splitext(submission.file.name)[1]
+    name = get_valid_filename(f"{student.last_name}_{student.first_name}_{student.student_id}{ext}")
+    if group_name:
+        return f"{get_valid_filename(group_name)}/{name}"
+    return name
+
+
+class MissingFilesError(Exception):
+    def __init__(self, names):
+        super().__init__(f"Fichiers introuvables : {', '.join(names)}")
+        self.names = names
+
+
+def stream_submissions_zip(project):
+    """
+    Archive ZIP de toutes les soumissions de `project`, lue directement depuis le stockage.
+
+    Les fichiers sont vérifiés avant le premier octet : un fichier manquant lève
+    MissingFilesError au lieu d'interrompre une réponse déjà commencée.
+    """
+    group_name = project.work_group.name if project.work_group_id else None
+    submissions = ProjectSubmission.objects.filter(project=project).exclude(file='').select_related(
+        'student'
+    ).order_by('student__last_name', 'student__first_name', 'id')
+    entries = [
+        (submission_archive_name(submission, group_name), submission.file.path)
+        for submission in submissions.iterator()
+    ]
+    missing = [arcname for arcname, path in entries if not os.path.isfile(path)]
+    if missing:
+        raise MissingFilesError(missing)
+    return stream_zip(entries)
+
+
+def matrix_sessions(subject_id=None, filiere=None, date_from=None, date_to=None):
+    """Colonnes de la matrice : séances de la période (et de la matière / filière) par ordre chronologique."""
+    sessions = AttendanceSession.objects.select_related('subject')
+    if subject_id:
+        sessions = sessions.filter(subject_id=subject_id)
+    if date_from:
+        sessions = sessions.filter(date__gte=date_from)
+    if date_to:
+        sessions = sessions.filter(date__lte=date_to)
+    if filiere:
+        sessions = sessions.filter(id__in=Attendance.objects.filter(student__filiere=filiere).values('session_id'))
+    return list(sessions.order_by('date', 'start_time', 'id'))
+
+
+def iter_attendance_matrix(sessions, filiere=None, chunk_size=MATRIX_CHUNK_SIZE):
+    """
+    Génère l'en-tête puis une ligne par étudiant : identité, P / A par séance, totaux.
+
+    Les présences sont lues triées par étudiant et pivotées au fil de l'eau :
+    seule la ligne en cours est en mémoire, quel que soit le nombre de présences.
+    """
+    columns = {session.id: index for index, session in enumerate(sessions)}
+    filiere_labels = dict(Student.FILIERE_CHOICES)
+    yield (
+        ['Nom', 'Prénom', 'Numéro étudiant', 'Filière']
+        + [f"{s.date.strftime('%d/%m/%Y')} {s.start_time.strftime('%H:%M')} {s.subject.code}" for s in sessions]
+        + ['Présences', 'Absences']
+    )
+    if not sessions:
+        return
+
+    attendances = Attendance.objects.filter(session_id__in=columns)
+    if filiere:
+        attendances = attendances.filter(student__filiere=filiere)
+    rows = attendances.order_by(
+        'student__last_name', 'student__first_name', 'student_id'
+    ).values_list(
+        'student_id', 'student__last_name', 'student__first_name', 'student__student_id', 'student__filiere',
+        'session_id', 'is_present',
+    )
+
+    current = None
+    cells = None
+    identity = None
+    for student_pk, last_name, first_name, number, student_filiere, session_id, is_present in rows.iterator(
+        chunk_size=chunk_size
+    ):
+        if student_pk != current:
+            if current is not None:
+                yield identity + cells + [cells.count('P'), cells.count('A')]
+            current = student_pk
+            identity = [last_name, first_name, number, filiere_labels.get(student_filiere, student_filiere)]
+            cells = [''] * len(columns)
+        cells[columns[session_id]] = 'P' if is_present else 'A'
+    if current is not None:
+        yield identity + cells + [cells.count('P'), cells.count('A')]
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : write() retourne la ligne au lieu de la stocker."""
+
+    def write(self, value):
+        return value
+
+
+def stream_attendance_matrix_csv(matrix):
+    """Octets CSV (UTF-8 avec BOM, séparateur « ; » pour Excel) ligne par ligne."""
+    writer = csv.writer(_Echo(), delimiter=';')
+    yield '\ufeff'.encode('utf-8')
+    for row in matrix:
+        yield writer.writerow(row).encode('utf-8')
+
+
+def build_attendance_matrix_xlsx(matrix, output):
+    """
+    Écrit la matrice dans `output` avec un classeur openpyxl en écriture seule.
+
+    Les lignes sont sérialisées au fur et à mesure dans un fichier temporaire
+    d'openpyxl : la mémoire ne dépend pas du nombre d'étudiants.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Présences')
+    sheet.freeze_panes = 'E2'
+    for row in matrix:
+        sheet.append(row)
+    workbook.save(output)
@@ -0,0 +1,40 @@
+import re
+import unicodedata
+
+from .models import Student
+
+
+# Variantes courantes rencontrées dans les fichiers d'import
+FILIERE_ALIASES = {
+    'informatique': ['info', 'computer science', 'cs'],
+    'mathematiques': ['math', 'maths'],
+    'physique': ['physics'],
+    'chimie': ['chemistry'],
+    'biologie': ['bio', 'biology'],
+    'economie': ['eco', 'economics', 'sciences economiques'],
+    'gestion': ['management'],
+}
+
+
+def normalize_label(value):
+    """Minuscules, sans accents ni espaces superflus : 'Économie ' -> 'economie'."""
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', value).strip().lower()
+
+
+def build_filiere_lookup():
+    lookup = {}
+    for key, label in Student.FILIERE_CHOICES:
+        for form in [key, label, *FILIERE_ALIASES.get(key, [])]:
+            lookup[normalize_label(form)] = key
+    return lookup
+
+
+# Index construit une seule fois au chargement du module
+FILIERE_LOOKUP = build_filiere_lookup()
+
+
+def resolve_filiere(value):
+    """Retourne la clé de `Student.FILIERE_CHOICES` correspondant à `value`, ou None."""
+    return FILIERE_LOOKUP.get(normalize_label(value))
@@ -3,8 +3,10 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, Field
-from .models import Student, Subject, WorkGroup, AttendanceSession, Project, ProjectSubmission, DirectorComment
-import openpyxl
+from .models import Student, WorkGroup, AttendanceSession, Project, ProjectSubmission, DirectorComment
+from .attendance import ROSTER_CHOICES
+from .filieres import resolve_filiere
+from .importers import ROSTER_EXTENSIONS, open_roster
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -36,7 +38,17 @@ class CustomUserCreationForm(UserCreationForm):
         )
 
 
+class FiliereField(forms.ChoiceField):
+    """Accepte la clé, le libellé ou un alias de filière, sans tenir compte des accents."""
+    
+    def to_python(self, value):
+        value = super().to_python(value)
+        return resolve_filiere(value) or value
+
+
 class StudentForm(forms.ModelForm):
+    filiere = FiliereField(choices=Student.FILIERE_CHOICES, label="Filière")
+    
     class Meta:
         model = Student
         fields = ['first_name', 'last_name', 'filiere', 'student_id', 'email']
@@ -60,7 +72,7 @@ class StudentForm(forms.ModelForm):
 
 class ExcelUploadForm(forms.Form):
     excel_file = forms.FileField(
-        label="Fichier Excel",
+        label="Fichier Excel ou CSV",
         help_text="Format attendu: Nom(s), Prénom(s), Filière, Numéro étudiant, Email (optionnel)"
     )
     
@@ -74,8 +86,17 @@ class ExcelUploadForm(forms.Form):
     
     def clean_excel_file(self):
         file = self.cleaned_data['excel_file']
-        if not file.name.endswith(('.xlsx', '.xls')):
-            raise forms.ValidationError("Le fichier doit être au format Excel (.xlsx ou .xls)")
+        if not file.name.lower().endswith(ROSTER_EXTENSIONS):
+            raise forms.ValidationError("Le fichier doit être au format Excel (.xlsx) ou CSV (.csv)")
+        
+        # Vérifier l'en-tête avant tout accès à la base
+        try:
+            open_roster(file).close()
+        except ValueError as e:
+            raise forms.ValidationError(f"Format de fichier invalide: {e}")
+        except Exception:
+            raise forms.ValidationError("Impossible de lire le fichier.")
+        file.seek(0)
         return file
 
 
@@ -86,6 +107,30 @@ class WorkGroupForm(forms.ModelForm):
         initial=4,
         label="Taille des groupes"
     )
+    mode = forms.ChoiceField(
+        choices=[
+            ('full', 'Recréer tous les groupes'),
+            ('incremental', 'Mettre à jour les groupes existants'),
+        ],
+        initial='full',
+        label="Mode",
+        help_text="La mise à jour conserve les groupes existants et leurs projets"
+    )
+    keep_apart = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 3, 'placeholder': '2024001, 2024002'}),
+        label="Étudiants à séparer",
+        help_text="Un ensemble par ligne : numéros étudiants séparés par des virgules"
+    )
+    avoid_previous = forms.BooleanField(
+        required=False,
+        label="Éviter les binômes des groupes précédents"
+    )
+    seed = forms.IntegerField(
+        required=False,
+        label="Graine aléatoire",
+        help_text="Optionnelle : la même graine redonne la même répartition"
+    )
     
     class Meta:
         model = WorkGroup
@@ -100,11 +145,48 @@ class WorkGroupForm(forms.ModelForm):
                 Column('group_size', css_class='form-group col-md-6 mb-3'),
             ),
             Field('is_mixed', css_class='form-check-input mb-3'),
+            'mode',
+            'keep_apart',
+            Row(
+                Column('avoid_previous', css_class='form-group col-md-6 mb-3'),
+                Column('seed', css_class='form-group col-md-6 mb-3'),
+            ),
             Submit('submit', 'Créer les groupes', css_class='btn btn-success')
         )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('mode') == 'incremental' and cleaned_data.get('avoid_previous'):
+            # La mise à jour ne déplace personne : les binômes existants restent
+            self.add_error('avoid_previous', "Option disponible uniquement pour la recréation des groupes.")
+        return cleaned_data
+    
+    def clean_keep_apart(self):
+        keep_apart = []
+        for line in self.cleaned_data['keep_apart'].splitlines():
+            numbers = [number.strip() for number in line.replace(';', ',').split(',') if number.strip()]
+            if len(numbers) >= 2:
+                keep_apart.append(numbers)
+        return keep_apart
 
 
 class AttendanceSessionForm(forms.ModelForm):
+    roster = forms.ChoiceField(
+        choices=ROSTER_CHOICES,
+        initial='all',
+        label="Étudiants concernés"
+    )
+    roster_filiere = forms.ChoiceField(
+        choices=[('', '---------')] + Student.FILIERE_CHOICES,
+        required=False,
+        label="Filière"
+    )
+    roster_group = forms.ModelChoiceField(
+        queryset=WorkGroup.objects.select_related('subject'),
+        required=False,
+        label="Groupe de travail"
+    )
+    
     class Meta:
         model = AttendanceSession
         fields = ['subject', 'date', 'start_time', 'end_time', 'notes']
@@ -125,9 +207,28 @@ class AttendanceSessionForm(forms.ModelForm):
                 Column('start_time', css_class='form-group col-md-4 mb-3'),
                 Column('end_time', css_class='form-group col-md-4 mb-3'),
             ),
+            Row(
+                Column('roster', css_class='form-group col-md-4 mb-3'),
+                Column('roster_filiere', css_class='form-group col-md-4 mb-3'),
+                Column('roster_group', css_class='form-group col-md-4 mb-3'),
+            ),
             'notes',
             Submit('submit', 'Créer la session', css_class='btn btn-primary')
         )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        roster = cleaned_data.get('roster')
+        if roster == 'filiere' and not cleaned_data.get('roster_filiere'):
+            self.add_error('roster_filiere', "Veuillez choisir une filière.")
+        elif roster == 'group':
+            work_group = cleaned_data.get('roster_group')
+            subject = cleaned_data.get('subject')
+            if not work_group:
+                self.add_error('roster_group', "Veuillez choisir un groupe de travail.")
+            elif subject and work_group.subject_id != subject.id:
+                self.add_error('roster_group', "Ce groupe n'appartient pas à la matière choisie.")
+        return cleaned_data
 
 
 class ProjectForm(forms.ModelForm):
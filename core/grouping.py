@@ -0,0 +1,230 @@
+"""
+Moteur de répartition des étudiants en groupes de travail.
+
+Indépendant de l'ORM : il reçoit des couples (identifiant, filière) et retourne
+des listes d'identifiants. La répartition est déterministe pour une graine donnée.
+"""
+import math
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import combinations
+
+
+# Nombre maximal d'échanges essayés pour résoudre le conflit d'un étudiant
+MAX_SWAP_CANDIDATES = 200
+
+# Un conflit strict pèse plus que tous les binômes à éviter d'un groupe réunis
+HARD_WEIGHT = 1000
+SOFT_WEIGHT = 1
+
+
+@dataclass
+class GroupAssignment:
+    groups: list
+    # Conflits "à séparer" qui n'ont pas pu être résolus
+    unresolved: list = field(default_factory=list)
+    # Binômes du semestre précédent qui n'ont pas pu être évités
+    repeated_pairs: int = 0
+
+
+def group_sizes(count, group_size):
+    """Tailles équilibrées (écart d'au plus 1), toutes inférieures ou égales à `group_size`."""
+    if count <= 0:
+        return []
+    num_groups = math.ceil(count / group_size)
+    base, extra = divmod(count, num_groups)
+    return [base + 1 if i < extra else base for i in range(num_groups)]
+
+
+def pairs_from_groups(groups):
+    """Tous les binômes (a, b) formés par des groupes existants."""
+    pairs = set()
+    for members in groups:
+        pairs.update(combinations(sorted(members), 2))
+    return pairs
+
+
+def _conflict_index(hard_pairs, soft_pairs=()):
+    index = defaultdict(dict)
+    for pairs, weight in ((soft_pairs, SOFT_WEIGHT), (hard_pairs, HARD_WEIGHT)):
+        for a, b in pairs:
+            if a != b:
+                index[a][b] = weight
+                index[b][a] = weight
+    return index
+
+
+def _deal(students, sizes, mixed, rng):
+    """Distribution initiale en O(n)."""
+    num_groups = len(sizes)
+    if mixed:
+        # Chaque filière mélangée puis distribuée à tour de rôle : chaque groupe
+        # reçoit au plus un étudiant de plus qu'un autre pour une filière donnée.
+        by_filiere = defaultdict(list)
+        for student_id, filiere in students:
+            by_filiere[filiere].append(student_id)
+        ordered = []
+        for filiere in sorted(by_filiere, key=lambda f: (-len(by_filiere[f]), f)):
+            members = by_filiere[filiere]
+            rng.shuffle(members)
+            ordered.extend(members)
+        groups = [[] for _ in range(num_groups)]
+        for i, student_id in enumerate(ordered):
+            groups[i % num_groups].append(student_id)
+        return groups
+
+    ordered = [student_id for student_id, _ in students]
+    rng.shuffle(ordered)
+    groups = []
+    start = 0
+    for size in sizes:
+        groups.append(ordered[start:start + size])
+        start += size
+    return groups
+
+
+def _conflicts_in(student_id, members, index, ignore=None):
+    conflicts = index.get(student_id)
+    if not conflicts:
+        return 0
+    return sum(conflicts.get(other, 0) for other in members if other != ignore)
+
+
+def _repair(groups, filiere_of, index, mixed, rng):
+    """Échanges locaux pour séparer les étudiants en conflit, sans déséquilibrer les groupes."""
+    group_of = {}
+    for g, members in enumerate(groups):
+        for student_id in members:
+            group_of[student_id] = g
+
+    num_groups = len(groups)
+    for student_id in sorted(index):
+        g = group_of.get(student_id)
+        if g is None or not _conflicts_in(student_id, groups[g], index):
+            continue
+
+        # Parcours des autres groupes à partir d'un point de départ aléatoire
+        start = rng.randrange(num_groups)
+        tried = 0
+        for offset in range(num_groups):
+            h = (start + offset) % num_groups
+            if h == g:
+                continue
+            for other in groups[h]:
+                # En mode mixte, on n'échange qu'au sein d'une même filière
+                if mixed and filiere_of[other] != filiere_of[student_id]:
+                    continue
+                tried += 1
+                before = (
+                    _conflicts_in(student_id, groups[g], index)
+                    + _conflicts_in(other, groups[h], index)
+                )
+                after = (
+                    _conflicts_in(student_id, groups[h], index, ignore=other)
+                    + _conflicts_in(other, groups[g], index, ignore=student_id)
+                )
+                if after < before:
+                    groups[g][groups[g].index(student_id)] = other
+                    groups[h][groups[h].index(other)] = student_id
+                    group_of[student_id], group_of[other] = h, g
+                    break
+                if tried >= MAX_SWAP_CANDIDATES:
+                    break
+            else:
+                continue
+            break
+
+
+def assign_groups(students, group_size, mixed=True, seed=None, keep_apart=(), avoid_pairs=()):
+    """
+    Répartit `students` (itérable de (identifiant, filière)) en groupes.
+
+    - `keep_apart` : ensembles d'identifiants à placer dans des groupes différents ;
+    - `avoid_pairs` : binômes à éviter si possible (ex. groupes du semestre précédent).
+    """
+    rng = random.Random(seed)
+    students = sorted(students)
+    filiere_of = dict(students)
+    sizes = group_sizes(len(students), group_size)
+    groups = _deal(students, sizes, mixed, rng)
+
+    hard_pairs = set()
+    for members in keep_apart:
+        hard_pairs.update(combinations(sorted(m for m in set(members) if m in filiere_of), 2))
+    soft_pairs = {
+        pair for pair in avoid_pairs
+        if pair[0] in filiere_of and pair[1] in filiere_of
+    }
+
+    # Les contraintes strictes d'abord, puis les binômes à éviter (sans recréer de conflit strict)
+    if hard_pairs:
+        _repair(groups, filiere_of, _conflict_index(hard_pairs), mixed, rng)
+    if soft_pairs:
+        _repair(groups, filiere_of, _conflict_index(hard_pairs, soft_pairs), mixed, rng)
+
+    group_of = {student_id: g for g, members in enumerate(groups) for student_id in members}
+    unresolved = [pair for pair in sorted(hard_pairs) if group_of[pair[0]] == group_of[pair[1]]]
+    repeated = sum(1 for a, b in soft_pairs if group_of[a] == group_of[b])
+    return GroupAssignment(groups=groups, unresolved=unresolved, repeated_pairs=repeated)
+
+
+@dataclass
+class Placement:
+    # Index du groupe existant -> identifiants ajoutés
+    added: dict
+    # Nouveaux groupes à créer (étudiants qui n'ont pas trouvé de place)
+    new_groups: list
+
+
+def place_students(groups, filiere_of, new_students, group_size, mixed=True, seed=None, keep_apart=()):
+    """
+    Place `new_students` ((identifiant, filière)) dans les groupes existants sans déplacer personne.
+
+    Chaque étudiant va dans le groupe non plein le moins rempli (en mode mixte :
+    celui qui compte le moins d'étudiants de sa filière), en évitant les étudiants
+    dont il doit être séparé. Le surplus forme de nouveaux groupes équilibrés.
+    """
+    rng = random.Random(seed)
+    new_students = sorted(new_students)
+    filiere_of = dict(filiere_of)
+    filiere_of.update(new_students)
+
+    conflicts = defaultdict(set)
+    for members in keep_apart:
+        for a, b in combinations(set(members), 2):
+            conflicts[a].add(b)
+            conflicts[b].add(a)
+
+    members_of = [set(members) for members in groups]
+    filiere_counts = [defaultdict(int) for _ in groups]
+    for g, members in enumerate(groups):
+        for student_id in members:
+            filiere_counts[g][filiere_of.get(student_id)] += 1
+
+    added = defaultdict(list)
+    leftover = []
+    order = list(range(len(groups)))
+    rng.shuffle(order)
+    for student_id, filiere in new_students:
+        best = None
+        best_key = None
+        for g in order:
+            if len(members_of[g]) >= group_size or conflicts[student_id] & members_of[g]:
+                continue
+            key = (filiere_counts[g][filiere] if mixed else 0, len(members_of[g]))
+            if best_key is None or key < best_key:
+                best, best_key = g, key
+        if best is None:
+            leftover.append((student_id, filiere))
+            continue
+        members_of[best].add(student_id)
+        filiere_counts[best][filiere] += 1
+        added[best].append(student_id)
+
+    new_groups = []
+    if leftover:
+        new_groups = assign_groups(
+            leftover, group_size, mixed=mixed, seed=seed, keep_apart=keep_apart
+        ).groups
+    return Placement(added=dict(added), new_groups=new_groups)
@@ -0,0 +1,142 @@
+import re
+
+from django.db import transaction
+
+from .grouping import assign_groups, pairs_from_groups, place_students
+from .models import Student, WorkGroup
+from .stats import invalidate_dashboard_stats
+
+
+def _previous_pairs(user):
+    """Binômes formés par les groupes existants de `user` (toutes matières)."""
+    memberships = {}
+    rows = WorkGroup.students.through.objects.filter(workgroup__created_by=user).values_list('workgroup_id', 'student_id')
+    for group_id, student_id in rows.iterator(chunk_size=2000):
+        memberships.setdefault(group_id, []).append(student_id)
+    return pairs_from_groups(memberships.values())
+
+
+def _resolve_keep_apart(keep_apart):
+    numbers = {number for members in keep_apart for number in members}
+    pk_by_number = dict(
+        Student.objects.filter(student_id__in=numbers).values_list('student_id', 'id')
+    ) if numbers else {}
+    return [[pk_by_number[n] for n in members if n in pk_by_number] for members in keep_apart]
+
+
+def generate_groups(subject, user, group_size, is_mixed, seed=None, keep_apart=(), avoid_previous=False):
+    """
+    Recrée les groupes de travail de `user` pour `subject`.
+
+    `keep_apart` contient des listes de numéros étudiants à séparer. Retourne
+    (nombre de groupes créés, `GroupAssignment`).
+    """
+    students = list(Student.objects.order_by().values_list('id', 'filiere'))
+    if not students:
+        raise ValueError("Aucun étudiant trouvé. Veuillez d'abord ajouter des étudiants.")
+
+    keep_apart = _resolve_keep_apart(keep_apart)
+    avoid_pairs = _previous_pairs(user) if avoid_previous else ()
+
+    assignment = assign_groups(
+        students, group_size, mixed=is_mixed, seed=seed,
+        keep_apart=keep_apart, avoid_pairs=avoid_pairs,
+    )
+
+    with transaction.atomic():
+        # Supprimer les anciens groupes pour cette matière
+        WorkGroup.objects.filter(subject=subject, created_by=user).delete()
+
+        work_groups = WorkGroup.objects.bulk_create([
+            WorkGroup(
+                name=f"Groupe {i} - {subject.name}",
+                subject=subject,
+                created_by=user,
+                is_mixed=is_mixed
+            )
+            for i in range(1, len(assignment.groups) + 1)
+        ])
+
+        # Toutes les appartenances en un seul INSERT par lot dans la table de liaison
+        Membership = WorkGroup.students.through
+        Membership.objects.bulk_create([
+            Membership(workgroup_id=work_group.id, student_id=student_id)
+            for work_group, members in zip(work_groups, assignment.groups)
+            for student_id in members
+        ], batch_size=2000)
+        # bulk_create n'émet pas de signaux
+        transaction.on_commit(invalidate_dashboard_stats)
+
+    return len(work_groups), assignment
+
+
+def _next_group_number(subject, user):
+    """Numéro suivant le plus grand « Groupe N » existant (des groupes ont pu être supprimés)."""
+    numbers = [
+        int(match.group(1))
+        for name in WorkGroup.objects.filter(subject=subject, created_by=user).values_list('name', flat=True)
+        if (match := re.match(r'Groupe (\d+)\b', name))
+    ]
+    return max(numbers, default=0) + 1
+
+
+def update_groups(subject, user, group_size, is_mixed, seed=None, keep_apart=()):
+    """
+    Met à jour les groupes existants de `user` pour `subject` sans les recréer.
+
+    Les étudiants sans groupe sont placés dans les groupes ayant de la place (ou
+    dans de nouveaux groupes) ; les étudiants supprimés ont déjà quitté leur groupe
+    (suppression en cascade). Les groupes existants et leurs projets sont conservés.
+    Retourne un dict {'added', 'new_groups'}.
+    """
+    Membership = WorkGroup.students.through
+    filiere_of = dict(Student.objects.order_by().values_list('id', 'filiere'))
+
+    groups = {}
+    for group_id in WorkGroup.objects.filter(subject=subject, created_by=user).order_by('id').values_list('id', flat=True):
+        groups[group_id] = []
+    memberships = Membership.objects.filter(
+        workgroup__subject=subject, workgroup__created_by=user
+    ).values_list('workgroup_id', 'student_id')
+    for group_id, student_id in memberships.iterator(chunk_size=2000):
+        groups[group_id].append(student_id)
+
+    placed = {student_id for members in groups.values() for student_id in members}
+    new_students = [(pk, filiere) for pk, filiere in filiere_of.items() if pk not in placed]
+
+    group_ids = list(groups)
+    placement = place_students(
+        [groups[group_id] for group_id in group_ids], filiere_of, new_students, group_size,
+        mixed=is_mixed, seed=seed, keep_apart=_resolve_keep_apart(keep_apart),
+    )
+
+    with transaction.atomic():
+        first_number = _next_group_number(subject, user)
+        new_work_groups = WorkGroup.objects.bulk_create([
+            WorkGroup(
+                name=f"Groupe {first_number + i} - {subject.name}",
+                subject=subject,
+                created_by=user,
+                is_mixed=is_mixed
+            )
+            for i in range(len(placement.new_groups))
+        ])
+
+        rows = [
+            Membership(workgroup_id=group_ids[index], student_id=student_id)
+            for index, members in placement.added.items()
+            for student_id in members
+        ]
+        rows += [
+            Membership(workgroup_id=work_group.id, student_id=student_id)
+            for work_group, members in zip(new_work_groups, placement.new_groups)
+            for student_id in members
+        ]
+        Membership.objects.bulk_create(rows, batch_size=2000)
+        # bulk_create n'émet pas de signaux
+        transaction.on_commit(invalidate_dashboard_stats)
+
+    return {
+        'added': len(rows),
+        'new_groups': len(new_work_groups),
+    }
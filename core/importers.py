@@ -0,0 +1,241 @@
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+import openpyxl
+
+from .attendance import touch_student_sessions
+from .filieres import normalize_label, resolve_filiere
+from .models import Student
+from .stats import invalidate_dashboard_stats
+
+
+IMPORT_CHUNK_SIZE = 500
+
+STUDENT_IMPORT_FIELDS = ['first_name', 'last_name', 'filiere', 'email']
+
+# Vérifiés ligne par ligne : une valeur trop longue ferait échouer tout le lot en base
+STUDENT_LENGTH_CHECKED_FIELDS = ['last_name', 'first_name', 'student_id', 'email']
+
+ROSTER_EXTENSIONS = ('.xlsx', '.xlsm', '.csv')
+
+# En-têtes attendus (forme normalisée) : Nom(s), Prénom(s), Filière, Numéro étudiant, Email
+ROSTER_HEADERS = [
+    ('Nom(s)', {'nom', 'noms'}),
+    ('Prénom(s)', {'prenom', 'prenoms'}),
+    ('Filière', {'filiere'}),
+    ('Numéro étudiant', {'numeroetudiant', 'numero', 'matricule'}),
+]
+ROSTER_OPTIONAL_HEADERS = [
+    ('Email', {'email', 'mail', 'courriel'}),
+]
+
+
+class RosterFormatError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def processed(self):
+        return self.created + self.updated + self.unchanged
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _normalize_header(value):
+    return re.sub(r'\(s\)|[^a-z]', '', normalize_label(value))
+
+
+def check_roster_header(header):
+    if not header:
+        raise RosterFormatError("Le fichier est vide.")
+
+    header = [_normalize_header(cell) for cell in header]
+    expected = ROSTER_HEADERS + ROSTER_OPTIONAL_HEADERS
+    for position, (label, accepted) in enumerate(expected):
+        if position >= len(header) or not header[position]:
+            if position < len(ROSTER_HEADERS):
+                raise RosterFormatError(f"Colonne {position + 1} manquante: '{label}' attendu.")
+            break
+        if header[position] not in accepted:
+            raise RosterFormatError(
+                f"Colonne {position + 1}: '{label}' attendu."
+            )
+
+
+def _iter_xlsx_rows(file):
+    # Mode lecture seule : les lignes sont lues au fil de l'eau, sans charger le classeur
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def _iter_csv_rows(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        for row in csv.reader(text, dialect):
+            yield tuple(row)
+    finally:
+        # Ne pas fermer le fichier téléversé avec l'enveloppe texte
+        text.detach()
+
+
+def iter_roster_rows(file):
+    """Générateur sur toutes les lignes (en-tête compris) d'un fichier .xlsx ou .csv."""
+    file.seek(0)
+    if file.name.lower().endswith('.csv'):
+        return _iter_csv_rows(file)
+    return _iter_xlsx_rows(file)
+
+
+def open_roster(file):
+    """Vérifie l'en-tête puis retourne un générateur sur les lignes de données."""
+    rows = iter_roster_rows(file)
+    try:
+        check_roster_header(next(rows, None))
+    except Exception:
+        rows.close()
+        raise
+    return rows
+
+
+def parse_student_row(row_num, row):
+    """Valide une ligne du fichier et retourne (données, erreur)."""
+    row = tuple(row) + (None,) * (5 - len(row))
+    last_name = str(row[0]).strip() if row[0] else ''
+    first_name = str(row[1]).strip() if row[1] else ''
+    filiere = str(row[2]).strip() if row[2] else ''
+    student_id = str(row[3]).strip() if row[3] else ''
+    email = str(row[4]).strip() if row[4] else ''
+
+    if not all([last_name, first_name, filiere, student_id]):
+        return None, f"Ligne {row_num}: Données manquantes"
+
+    filiere_key = resolve_filiere(filiere)
+    if not filiere_key:
+        return None, f"Ligne {row_num}: Filière '{filiere}' non reconnue"
+
+    data = {
+        'student_id': student_id,
+        'first_name': first_name,
+        'last_name': last_name,
+        'filiere': filiere_key,
+        'email': email,
+    }
+    for field_name in STUDENT_LENGTH_CHECKED_FIELDS:
+        model_field = Student._meta.get_field(field_name)
+        if len(data[field_name]) > model_field.max_length:
+            return None, (
+                f"Ligne {row_num}: {model_field.verbose_name} trop long "
+                f"({model_field.max_length} caractères maximum)"
+            )
+
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            return None, f"Ligne {row_num}: Email '{email}' invalide"
+
+    return data, None
+
+
+def _import_chunk(chunk, result):
+    # Dédoublonner dans le lot : la dernière ligne pour un numéro l'emporte
+    rows_by_id = {}
+    for row_num, row in chunk:
+        try:
+            data, error = parse_student_row(row_num, row)
+        except Exception as e:
+            data, error = None, f"Ligne {row_num}: Erreur - {str(e)}"
+        if error:
+            result.errors.append(error)
+            continue
+        rows_by_id[data['student_id']] = data
+
+    if not rows_by_id:
+        return
+
+    with transaction.atomic():
+        existing = Student.objects.select_for_update().in_bulk(
+            list(rows_by_id), field_name='student_id'
+        )
+
+        to_create = []
+        to_update = []
+        for student_id, data in rows_by_id.items():
+            student = existing.get(student_id)
+            if student is None:
+                to_create.append(Student(**data))
+                continue
+
+            changed = False
+            for field_name in STUDENT_IMPORT_FIELDS:
+                if getattr(student, field_name) != data[field_name]:
+                    setattr(student, field_name, data[field_name])
+                    changed = True
+            if changed:
+                to_update.append(student)
+            else:
+                result.unchanged += 1
+
+        if to_create:
+            Student.objects.bulk_create(to_create, batch_size=IMPORT_CHUNK_SIZE)
+        if to_update:
+            Student.objects.bulk_update(to_update, STUDENT_IMPORT_FIELDS, batch_size=IMPORT_CHUNK_SIZE)
+            # bulk_update n'émet pas de signaux : PDF en cache des sessions concernées
+            touch_student_sessions([student.pk for student in to_update])
+
+    result.created += len(to_create)
+    result.updated += len(to_update)
+    if to_create:
+        # bulk_create n'émet pas de signaux
+        invalidate_dashboard_stats()
+
+
+def import_students_rows(rows, start_row=2, chunk_size=IMPORT_CHUNK_SIZE, on_chunk=None):
+    """
+    Importe des lignes (Nom, Prénom, Filière, Numéro, Email) par lots.
+
+    Chaque lot charge les étudiants existants en une requête puis écrit via
+    bulk_create / bulk_update dans une seule transaction. `on_chunk(result)`
+    est appelé après chaque lot pour suivre la progression.
+    """
+    result = ImportResult()
+    numbered_rows = (
+        (row_num, row)
+        for row_num, row in enumerate(rows, start=start_row)
+        if row and any(row[:4])  # Ignorer les lignes vides
+    )
+    for chunk in _chunked(numbered_rows, chunk_size):
+        _import_chunk(chunk, result)
+        if on_chunk:
+            on_chunk(result)
+    return result
@@ -0,0 +1,226 @@
+"""
+Réception des soumissions de projet en période de rush.
+
+L'envoi est accepté et horodaté immédiatement : le fichier va dans le stockage
+et un enregistrement JSON dans un dossier d'attente, sans écrire en base.
+La commande drain_submissions écrit ensuite les soumissions par lots, depuis
+un seul processus, ce qui évite les "database is locked" de SQLite.
+"""
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.http import HttpResponseRedirect
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ProjectSubmission
+
+
+# Un verrou plus ancien a été laissé par un processus interrompu
+SLOT_TIMEOUT = 10 * 60
+
+SPOOL_BATCH_SIZE = 100
+
+# Vues dont le corps (fichier envoyé) n'est lu qu'une fois la place réservée
+INTAKE_URL_NAMES = {'submit_project'}
+
+
+class IntakeBusy(Exception):
+    pass
+
+
+def _spool_dir():
+    return Path(settings.SUBMISSION_SPOOL_DIR)
+
+
+def _acquire_slot(prefix, limit):
+    slots = _spool_dir() / 'slots'
+    slots.mkdir(parents=True, exist_ok=True)
+    for i in range(limit):
+        path = slots / f"{prefix}{i}.lock"
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return path
+            except FileExistsError:
+                try:
+                    if time.time() - path.stat().st_mtime < SLOT_TIMEOUT:
+                        break
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+    return None
+
+
+@contextmanager
+def intake_slot(user_id):
+    """
+    Réserve une place de réception pour `user_id`, ou lève IntakeBusy.
+
+    Les places sont des fichiers verrou créés de façon exclusive : la limite
+    vaut pour tous les processus du serveur, sans passer par la base.
+    """
+    per_user = settings.SUBMISSION_MAX_CONCURRENT_PER_USER
+    total = settings.SUBMISSION_MAX_CONCURRENT
+    acquired = []
+    try:
+        for prefix, limit in ((f"user-{user_id}-", per_user), ('global-', total)):
+            slot = _acquire_slot(prefix, limit)
+            if slot is None:
+                raise IntakeBusy()
+            acquired.append(slot)
+        yield
+    finally:
+        for slot in acquired:
+            slot.unlink(missing_ok=True)
+
+
+class SubmissionIntakeMiddleware:
+    """
+    Réserve la place de réception d'un envoi de projet avant la lecture du corps.
+
+    Le __call__ des intergiciels s'exécute avant tout process_view : la place
+    est donc prise avant que CsrfViewMiddleware ne lise request.POST, qui
+    analyse le multipart et écrit le fichier sur disque. Sans place, la
+    requête est renvoyée sans que le fichier soit lu. À placer après les
+    intergiciels d'authentification et de messages.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method != 'POST' or not request.user.is_authenticated:
+            return self.get_response(request)
+        try:
+            url_name = resolve(request.path_info).url_name
+        except Resolver404:
+            url_name = None
+        if url_name not in INTAKE_URL_NAMES:
+            return self.get_response(request)
+
+        try:
+            with intake_slot(request.user.id):
+                return self.get_response(request)
+        except IntakeBusy:
+            messages.warning(request, 'Trop de soumissions en cours, veuillez réessayer dans quelques secondes.')
+            return HttpResponseRedirect(request.path)
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as output:
+            json.dump(data, output)
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def enqueue_submission(project, student, file, notes=''):
+    """Enregistre le fichier et met la soumission en attente ; retourne l'heure de réception."""
+    received_at = timezone.now()
+    field = ProjectSubmission._meta.get_field('file')
+    if isinstance(file, FieldFile) and file._committed:
+        # Fichier inchangé (seules les notes sont modifiées)
+        name = file.name
+    else:
+        name = field.storage.save(field.generate_filename(None, file.name), file, max_length=field.max_length)
+    record = {
+        'project_id': project.pk,
+        'student_id': student.pk,
+        'file': name,
+        'notes': notes,
+        'received_at': received_at.isoformat(),
+    }
+    stamp = received_at.strftime('%Y%m%dT%H%M%S%f')
+    _write_atomic(_spool_dir() / 'pending' / f"{stamp}-{student.pk}-{project.pk}.json", record)
+    return received_at
+
+
+def spooled_submission_files():
+    """
+    Fichiers référencés par des soumissions en attente ou en échec (à protéger
+    du ramasse-miettes) : un enregistrement en échec peut être remis en attente.
+    """
+    names = set()
+    for folder in ('pending', 'failed'):
+        for path in (_spool_dir() / folder).glob('*.json'):
+            try:
+                names.add(json.loads(path.read_text(encoding='utf-8'))['file'])
+            except (OSError, ValueError, KeyError):
+                continue
+    return names
+
+
+@dataclass
+class DrainResult:
+    saved: int = 0
+    # Envoi plus ancien qu'une soumission déjà enregistrée
+    skipped: int = 0
+    failed: int = 0
+
+
+def _apply_record(record):
+    received_at = parse_datetime(record['received_at'])
+    submission = ProjectSubmission.objects.filter(
+        project_id=record['project_id'], student_id=record['student_id']
+    ).first()
+    if submission and submission.submitted_at > received_at:
+        return False
+    if submission is None:
+        submission = ProjectSubmission(project_id=record['project_id'], student_id=record['student_id'])
+    submission.file.name = record['file']
+    submission.notes = record['notes']
+    submission.submitted_at = received_at
+    submission.save()
+    return True
+
+
+def drain_submissions(batch_size=SPOOL_BATCH_SIZE):
+    """
+    Écrit en base un lot de soumissions en attente, dans l'ordre de réception.
+
+    Le lot tient dans une seule transaction ; les enregistrements ne sont
+    supprimés qu'après validation (rejouer un enregistrement est sans effet).
+    """
+    pending = _spool_dir() / 'pending'
+    paths = sorted(pending.glob('*.json'))[:batch_size]
+    result = DrainResult()
+    failed = []
+    with transaction.atomic():
+        for path in paths:
+            try:
+                record = json.loads(path.read_text(encoding='utf-8'))
+                with transaction.atomic():
+                    if _apply_record(record):
+                        result.saved += 1
+                    else:
+                        result.skipped += 1
+            except Exception as e:
+                failed.append((path, str(e)))
+
+    failed_dir = _spool_dir() / 'failed'
+    for path, error in failed:
+        # Conservé pour examen, avec l'erreur
+        failed_dir.mkdir(parents=True, exist_ok=True)
+        (failed_dir / f"{path.stem}.error").write_text(error, encoding='utf-8')
+        os.replace(path, failed_dir / path.name)
+        result.failed += 1
+    for path in paths:
+        path.unlink(missing_ok=True)
+    return result
@@ -0,0 +1,226 @@
+import os
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+
+from .attendance import filter_director_sessions
+from .exports import session_archive_name, stream_zip
+from .groups import generate_groups, update_groups
+from .importers import import_students_rows, open_roster
+from .models import AttendanceSession, Job, Subject
+from .pdf import attendance_pdf_filename, cached_attendance_pdf, merge_attendance_pdfs, render_attendance_pdf
+
+
+JOB_HANDLERS = {}
+
+# Sans signe de vie depuis JOB_LEASE, une tâche "en cours" est considérée comme perdue
+JOB_LEASE = timedelta(minutes=2)
+JOB_MAX_ATTEMPTS = 3
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def init_worker_process():
+    """Initialisation d'un processus de pool : chacun ouvre ses propres connexions."""
+    django.setup()
+    connections.close_all()
+
+
+def enqueue_job(kind, user, payload=None, input_file=None):
+    """Crée une tâche en attente ; elle sera exécutée par `manage.py run_jobs`."""
+    job = Job(kind=kind, created_by=user, payload=payload or {})
+    if input_file is not None:
+        job.input_file.save(input_file.name, File(input_file), save=False)
+    job.save()
+    return job
+
+
+def recover_stale_jobs(now=None):
+    """
+    Remet en attente les tâches "en cours" dont le processus a disparu.
+
+    Au-delà de JOB_MAX_ATTEMPTS, la tâche passe en échec. Retourne le nombre
+    de tâches remises en attente.
+    """
+    now = now or timezone.now()
+    stale = Job.objects.filter(status='running', heartbeat_at__lt=now - JOB_LEASE)
+    stale.filter(attempts__gte=JOB_MAX_ATTEMPTS).update(
+        status='failed', error="Tâche interrompue (processus arrêté).", finished_at=now
+    )
+    return stale.update(status='pending')
+
+
+def heartbeat_jobs(job_ids):
+    """Renouvelle le bail des tâches en cours d'exécution."""
+    if job_ids:
+        Job.objects.filter(id__in=job_ids, status='running').update(heartbeat_at=timezone.now())
+
+
+def claim_next_job():
+    """Réserve la plus ancienne tâche en attente, sans courtier externe."""
+    recover_stale_jobs()
+    for job_id in Job.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = Job.objects.filter(id=job_id, status='pending').update(
+            status='running', started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            return job_id
+    return None
+
+
+def report_progress(job, progress, total=None):
+    job.progress = progress
+    fields = {'progress': progress}
+    if total is not None:
+        job.total = total
+        fields['total'] = total
+    Job.objects.filter(id=job.id).update(**fields)
+
+
+def run_job(job_id):
+    """Exécute une tâche réservée ; appelé dans un processus du pool."""
+    close_old_connections()
+    job = Job.objects.select_related('created_by').get(id=job_id)
+    try:
+        handler = JOB_HANDLERS[job.kind]
+        job.result = handler(job) or {}
+        job.status = 'done'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = f"{e}\n\n{traceback.format_exc()}"
+    job.finished_at = timezone.now()
+    job.save(update_fields=['result', 'status', 'error', 'finished_at', 'input_file', 'output_file'])
+    close_old_connections()
+    return job.status
+
+
+@job_handler('import_students')
+def import_students_job(job):
+    try:
+        with job.input_file.open('rb') as input_file:
+            rows = open_roster(input_file)
+            result = import_students_rows(
+                rows, on_chunk=lambda partial: report_progress(job, partial.processed + len(partial.errors))
+            )
+    finally:
+        # Succès ou échec : le fichier téléversé ne sert plus
+        job.input_file.delete(save=False)
+    return {
+        'created': result.created,
+        'updated': result.updated,
+        'unchanged': result.unchanged,
+        'errors': result.errors,
+    }
+
+
+@job_handler('create_groups')
+def create_groups_job(job):
+    subject = Subject.objects.get(id=job.payload['subject_id'])
+    if job.payload.get('mode') == 'incremental':
+        changes = update_groups(
+            subject, job.created_by, job.payload['group_size'], job.payload['is_mixed'],
+            seed=job.payload.get('seed'),
+            keep_apart=job.payload.get('keep_apart', []),
+        )
+        report_progress(job, 1, 1)
+        return dict(changes, subject=subject.name)
+    
+    created, assignment = generate_groups(
+        subject, job.created_by, job.payload['group_size'], job.payload['is_mixed'],
+        seed=job.payload.get('seed'),
+        keep_apart=job.payload.get('keep_apart', []),
+        avoid_previous=job.payload.get('avoid_previous', False),
+    )
+    report_progress(job, created, created)
+    return {
+        'groups': created,
+        'subject': subject.name,
+        'unresolved': len(assignment.unresolved),
+        'repeated_pairs': assignment.repeated_pairs,
+    }
+
+
+@job_handler('attendance_pdf')
+def attendance_pdf_job(job):
+    session = AttendanceSession.objects.select_related('subject', 'created_by').get(
+        id=job.payload['session_id']
+    )
+    render_attendance_pdf(session)
+    report_progress(job, 1, 1)
+    return {'filename': attendance_pdf_filename(session), 'session_id': session.id}
+
+
+def _render_session_pdf(session_id):
+    """Rend le PDF d'une session dans le cache ; exécuté dans un processus du pool d'export."""
+    close_old_connections()
+    session = AttendanceSession.objects.select_related('subject', 'created_by').get(id=session_id)
+    render_attendance_pdf(session)
+    return session_id
+
+
+def render_missing_pdfs(job, sessions):
+    """
+    Rend en parallèle les PDF absents du cache, dans un pool de processus
+    propre à la tâche. Les sessions déjà en cache comptent comme faites.
+    """
+    missing = [session.id for session in sessions.iterator() if cached_attendance_pdf(session) is None]
+    done = job.total - len(missing)
+    report_progress(job, done)
+    if not missing:
+        return
+
+    workers = min(settings.ATTENDANCE_EXPORT_WORKERS or os.cpu_count() or 1, len(missing))
+    if workers == 1:
+        # Un seul processus : rendu dans le worker courant, sans pool
+        for session_id in missing:
+            _render_session_pdf(session_id)
+            done += 1
+            report_progress(job, done)
+        return
+
+    # Fermer les connexions avant de créer les processus
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_process) as pool:
+        for future in as_completed([pool.submit(_render_session_pdf, session_id) for session_id in missing]):
+            future.result()
+            done += 1
+            report_progress(job, done)
+
+
+@job_handler('attendance_export')
+def attendance_export_job(job):
+    """Listes de présence des sessions filtrées : archive ZIP ou PDF unique, depuis les PDF en cache."""
+    sessions = filter_director_sessions(job.payload).select_related('subject', 'created_by')
+    report_progress(job, 0, sessions.count())
+    render_missing_pdfs(job, sessions)
+    # Tout est en cache : l'export ne fait que recopier les fichiers
+    # (une session modifiée entre-temps est rendue à nouveau ici)
+    with tempfile.TemporaryFile() as output:
+        if job.payload.get('format') == 'pdf':
+            merge_attendance_pdfs((render_attendance_pdf(session) for session in sessions.iterator()), output)
+            filename = 'presences.pdf'
+        else:
+            entries = (
+                (session_archive_name(session), render_attendance_pdf(session))
+                for session in sessions.iterator()
+            )
+            for chunk in stream_zip(entries):
+                output.write(chunk)
+            filename = 'presences.zip'
+        output.seek(0)
+        job.output_file.save(filename, File(output), save=False)
+    return {'sessions': job.progress}
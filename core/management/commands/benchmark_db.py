@@ -0,0 +1,173 @@
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, connections, transaction
+from django.utils import timezone
+
+from core.attendance import apply_attendance_states, create_session_roster
+from core.importers import import_students_rows
+from core.models import AttendanceSession, Project, ProjectSubmission, Student, Subject
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la base configurée (DJANGO_DB_ENGINE) sur les écritures de l'application : "
+        "appels, pointages, soumissions et importations, en parallèle. "
+        "Travaille sur une base de test créée puis supprimée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Écrivains simultanés.")
+        parser.add_argument('--students', type=int, default=500, help="Étudiants de la promotion.")
+        parser.add_argument('--ops', type=int, default=20, help="Opérations par écrivain et par scénario.")
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        tmpdir = None
+        if connection.vendor == 'sqlite':
+            # Base sur disque : une base en mémoire ne dirait rien du verrouillage
+            tmpdir = tempfile.TemporaryDirectory()
+            settings_dict.setdefault('TEST', {})['NAME'] = str(Path(tmpdir.name) / 'benchmark.sqlite3')
+
+        old_name = settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write(f"Base : {connection.vendor} ({self._describe()})")
+            context = self._seed(options['students'])
+            scenarios = [
+                ('Appel complet', self._roll_call),
+                ('Pointage unitaire', self._toggle),
+                ('Soumission', self._submission),
+                ('Importation (50 lignes)', self._import),
+            ]
+            self.stdout.write(f"{'Scénario':<26}{'ops':>6}{'erreurs':>9}{'ops/s':>9}{'médiane':>10}{'p95':>10}")
+            for label, operation in scenarios:
+                self._run(label, operation, context, options['threads'], options['ops'])
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmpdir:
+                tmpdir.cleanup()
+
+    def _describe(self):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                pragmas = [
+                    f"{name}={cursor.execute(f'PRAGMA {name}').fetchone()[0]}"
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout')
+                ]
+            return ', '.join(pragmas)
+        settings_dict = connection.settings_dict
+        pool = settings_dict['OPTIONS'].get('pool')
+        return f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}, pool={'oui' if pool else 'non'}"
+
+    def _seed(self, count):
+        user = User.objects.create_user('benchmark')
+        subject = Subject.objects.create(name='Benchmark', code='BENCH', teacher='-', teacher_email='b@example.com')
+        Student.objects.bulk_create([
+            Student(first_name='Prénom', last_name=f'Nom{i:05d}', filiere='gestion', student_id=f'B{i:05d}')
+            for i in range(count)
+        ])
+        student_ids = list(Student.objects.values_list('id', flat=True))
+        project = Project.objects.create(
+            title='Benchmark', description='-', subject=subject, project_type='individual',
+            due_date=timezone.now() + timedelta(days=1), created_by=user,
+        )
+        session = self._new_session(subject, user, 0)
+        create_session_roster(session, student_ids)
+        return {
+            'user': user, 'subject': subject, 'project': project, 'session': session,
+            'student_ids': student_ids, 'counter': iter(range(1, 10 ** 9)), 'lock': threading.Lock(),
+        }
+
+    def _new_session(self, subject, user, n):
+        return AttendanceSession.objects.create(
+            subject=subject, date=date(2020, 1, 1) + timedelta(days=n),
+            start_time=dtime(8, 0), end_time=dtime(10, 0), created_by=user,
+        )
+
+    def _next(self, context):
+        with context['lock']:
+            return next(context['counter'])
+
+    # Scénarios : une opération = ce que fait une requête de l'application
+
+    def _roll_call(self, context, rng):
+        session = self._new_session(context['subject'], context['user'], self._next(context))
+        create_session_roster(session, context['student_ids'])
+        present = rng.sample(context['student_ids'], len(context['student_ids']) * 9 // 10)
+        apply_attendance_states(session, present_ids=present)
+
+    def _toggle(self, context, rng):
+        student_id = rng.choice(context['student_ids'])
+        if rng.random() < 0.5:
+            apply_attendance_states(context['session'], present_ids=[student_id])
+        else:
+            apply_attendance_states(context['session'], absent_ids=[student_id])
+
+    def _submission(self, context, rng):
+        student_id = rng.choice(context['student_ids'])
+        with transaction.atomic():
+            submission = ProjectSubmission.objects.filter(
+                project=context['project'], student_id=student_id
+            ).first() or ProjectSubmission(project=context['project'], student_id=student_id)
+            submission.file.name = f"submissions/bench/{rng.getrandbits(64):016x}.zip"
+            submission.submitted_at = timezone.now()
+            submission.save()
+
+    def _import(self, context, rng):
+        start = rng.randrange(max(1, len(context['student_ids']) - 50))
+        rows = [
+            (f'Nom{i:05d}', rng.choice(['Prénom', 'Prenom']), 'Gestion', f'B{i:05d}', '')
+            for i in range(start, start + 50)
+        ]
+        import_students_rows(rows)
+
+    def _run(self, label, operation, context, threads, ops):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(ops):
+                    began = time.perf_counter()
+                    try:
+                        operation(context, rng)
+                    except DatabaseError as e:
+                        with lock:
+                            errors.append(str(e))
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - began)
+            finally:
+                connections.close_all()
+
+        connections.close_all()
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, range(threads)))
+        elapsed = time.perf_counter() - began
+
+        latencies.sort()
+        if latencies:
+            median = statistics.median(latencies) * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        else:
+            median = p95 = 0
+        line = (
+            f"{label:<26}{len(latencies):>6}{len(errors):>9}{len(latencies) / elapsed:>9.1f}"
+            f"{median:>8.0f}ms{p95:>8.0f}ms"
+        )
+        self.stdout.write(self.style.ERROR(line) if errors else line)
+        if errors:
+            self.stdout.write(f"  ex. : {errors[0]}")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.attendance import repair_session_counters, session_counter_drift
+
+
+class Command(BaseCommand):
+    help = "Vérifie les compteurs des sessions (présents, inscrits, commentaires) et corrige les écarts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help="Corriger les sessions en écart.")
+
+    def handle(self, *args, **options):
+        drifted = list(session_counter_drift().values_list(
+            'id', 'present_count', 'real_present', 'total_count', 'real_total', 'comment_count', 'real_comments'
+        ))
+        for session_id, present, real_present, total, real_total, comments, real_comments in drifted[:50]:
+            self.stdout.write(
+                f"  session #{session_id} : présents {present} (réel {real_present}), "
+                f"inscrits {total} (réel {real_total}), commentaires {comments} (réel {real_comments})"
+            )
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Aucun écart"))
+            return
+
+        if options['repair']:
+            repaired = repair_session_counters([row[0] for row in drifted])
+            self.stdout.write(self.style.SUCCESS(f"{repaired} session(s) corrigée(s)"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(drifted)} session(s) en écart (--repair pour corriger)"))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.intake import SPOOL_BATCH_SIZE, drain_submissions
+
+
+class Command(BaseCommand):
+    help = "Enregistre en base les soumissions de projet en attente, par lots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SPOOL_BATCH_SIZE, help="Soumissions par transaction.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Délai entre deux scrutations (s).")
+        parser.add_argument('--once', action='store_true', help="S'arrêter quand la file est vide.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = drain_submissions(batch_size=options['batch_size'])
+            processed = result.saved + result.skipped + result.failed
+            if processed:
+                self.stdout.write(
+                    f"{result.saved} soumission(s) enregistrée(s), {result.skipped} ignorée(s), "
+                    f"{result.failed} en échec"
+                )
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from core.stored_files import GC_GRACE_PERIOD, collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Supprime les fichiers de soumission qui ne sont plus référencés et affiche l'espace libéré."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes', type=int, default=int(GC_GRACE_PERIOD.total_seconds() // 60),
+            help="Ne pas toucher aux fichiers plus récents (envois en cours)."
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Afficher sans supprimer.")
+
+    def handle(self, *args, **options):
+        result = collect_garbage(
+            grace=timedelta(minutes=options['grace_minutes']), dry_run=options['dry_run']
+        )
+        if options['verbosity'] > 1:
+            for name in result.deleted:
+                self.stdout.write(f"  {name}")
+        if result.repaired:
+            self.stdout.write(self.style.WARNING(f"{result.repaired} compteur(s) de références corrigé(s)"))
+
+        verb = "seraient supprimés" if options['dry_run'] else "supprimés"
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(result.deleted)} fichier(s) {verb}, {filesizeformat(result.reclaimed)} libéré(s)"
+        ))
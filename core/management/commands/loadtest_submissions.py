@@ -0,0 +1,185 @@
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.intake import drain_submissions
+from core.models import Project, ProjectSubmission, Student, Subject, UserProfile
+
+
+LOADTEST_PREFIX = 'loadtest-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Simule des centaines d'étudiants soumettant un projet dans la dernière minute. "
+        "Travaille sur une base de test, un dossier de fichiers et une file d'attente "
+        "temporaires, créés puis supprimés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=300, help="Nombre d'étudiants simulés.")
+        parser.add_argument('--window', type=float, default=60.0, help="Durée du rush (s).")
+        parser.add_argument('--concurrency', type=int, default=100, help="Requêtes simultanées au plus.")
+        parser.add_argument('--size', type=int, default=100, help="Taille de chaque fichier (Kio).")
+        parser.add_argument('--retries', type=int, default=3, help="Nouvelles tentatives après un refus.")
+        parser.add_argument('--host', default=None, help="En-tête Host des requêtes.")
+
+    def handle(self, *args, **options):
+        count = options['students']
+        if count <= 0:
+            raise CommandError("--students doit être positif.")
+        host = options['host'] or next(
+            (h for h in settings.ALLOWED_HOSTS if h not in ('*',) and not h.startswith('.')), 'localhost'
+        )
+
+        settings_dict = connection.settings_dict
+        with tempfile.TemporaryDirectory() as tmpdir:
+            if connection.vendor == 'sqlite':
+                # Base sur disque, partagée par les threads du rush
+                settings_dict.setdefault('TEST', {})['NAME'] = str(Path(tmpdir) / 'loadtest.sqlite3')
+            old_name = settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                # Fichiers, file d'attente et cache isolés : la vraie file n'est jamais vidée ici
+                with override_settings(
+                    MEDIA_ROOT=str(Path(tmpdir) / 'media'),
+                    SUBMISSION_SPOOL_DIR=str(Path(tmpdir) / 'spool'),
+                    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                ):
+                    self.stdout.write(f"Préparation de {count} étudiants...")
+                    project, users = self._setup(count)
+                    self._run(project, users, host, options)
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _setup(self, count):
+        owner = User.objects.create_user(f'{LOADTEST_PREFIX}owner')
+        subject = Subject.objects.create(
+            name='Test de charge', code=f'{LOADTEST_PREFIX}subject', teacher='-', teacher_email='loadtest@example.com'
+        )
+        project = Project.objects.create(
+            title='Test de charge', description='-', subject=subject, project_type='individual',
+            due_date=timezone.now() + timedelta(minutes=1), created_by=owner,
+        )
+        users = User.objects.bulk_create([User(username=f'{LOADTEST_PREFIX}{i}') for i in range(count)])
+        users = list(User.objects.filter(username__in=[u.username for u in users]).order_by('id'))
+        UserProfile.objects.bulk_create([UserProfile(user=u, user_type='student') for u in users])
+        Student.objects.bulk_create([
+            Student(user=u, first_name='Test', last_name=u.username, filiere='gestion', student_id=u.username)
+            for u in users
+        ])
+        return project, users
+
+    def _run(self, project, users, host, options):
+        url = reverse('submit_project', args=[project.id])
+        accepted_url = reverse('student_projects')
+        size = options['size'] * 1024
+
+        # Connexion et rôle en session avant le rush (hors mesures)
+        clients = []
+        for user in users:
+            client = Client(HTTP_HOST=host, raise_request_exception=False)
+            client.force_login(user)
+            client.get(reverse('dashboard'))
+            clients.append(client)
+        connections.close_all()
+
+        outcomes = Counter()
+        latencies = []
+        lock = threading.Lock()
+        start = time.monotonic() + 1
+        rng = random.Random(0)
+        offsets = sorted(rng.uniform(0, options['window']) for _ in users)
+
+        def submit(index):
+            client = clients[index]
+            time.sleep(max(0, start + offsets[index] - time.monotonic()))
+            try:
+                for attempt in range(options['retries'] + 1):
+                    upload = SimpleUploadedFile(f'projet_{index}.zip', os.urandom(size))
+                    began = time.monotonic()
+                    response = client.post(url, {'file': upload, 'notes': ''})
+                    elapsed = time.monotonic() - began
+                    if response.status_code == 302 and response.url == accepted_url:
+                        outcome = 'accepted'
+                    elif response.status_code == 302 and response.url == url:
+                        outcome = 'throttled'
+                    else:
+                        outcome = f'error {response.status_code}'
+                    with lock:
+                        latencies.append(elapsed)
+                        outcomes[outcome] += 1
+                    if outcome != 'throttled':
+                        return outcome
+                    time.sleep(0.2 * (attempt + 1) + rng.random() * 0.2)
+                return 'gave_up'
+            finally:
+                connections.close_all()
+
+        self.stdout.write(
+            f"Rush : {len(users)} soumissions sur {options['window']:.0f} s, "
+            f"{options['concurrency']} requêtes simultanées au plus..."
+        )
+        # La file est vidée pendant le rush, comme par drain_submissions en production
+        drained = 0
+        rush_over = threading.Event()
+
+        def drain():
+            nonlocal drained
+            try:
+                while True:
+                    result = drain_submissions()
+                    drained += result.saved
+                    if not (result.saved + result.skipped + result.failed):
+                        if rush_over.is_set():
+                            return
+                        time.sleep(0.5)
+            finally:
+                connections.close_all()
+
+        drainer = threading.Thread(target=drain)
+        drainer.start()
+        began = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                finals = Counter(pool.map(submit, range(len(users))))
+        finally:
+            rush_over.set()
+            drainer.join()
+        duration = time.monotonic() - began
+        stored = ProjectSubmission.objects.filter(project=project).count()
+
+        latencies.sort()
+        self.stdout.write(f"Durée : {duration:.1f} s, {len(latencies)} requêtes")
+        for outcome, n in sorted(outcomes.items()):
+            self.stdout.write(f"  {outcome} : {n}")
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"Latence : médiane {statistics.median(latencies) * 1000:.0f} ms, "
+                f"p95 {p95 * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms"
+            )
+        self.stdout.write(f"Abandons après {options['retries']} refus : {finals['gave_up']}")
+        lost = finals['accepted'] - stored
+        style = self.style.SUCCESS if lost == 0 else self.style.ERROR
+        self.stdout.write(style(
+            f"{finals['accepted']} acceptées, {stored} enregistrées en base ({drained} par la file), {lost} perdue(s)"
+        ))
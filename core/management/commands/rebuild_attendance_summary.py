@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.summaries import rebuild_summaries, summary_drift
+
+
+class Command(BaseCommand):
+    help = "Recalcule les bilans de présence par étudiant et par matière depuis les présences."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Afficher les écarts sans rien modifier.")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = summary_drift()
+            for (student_id, subject_id), stored, expected in drift[:50]:
+                self.stdout.write(
+                    f"  étudiant #{student_id}, matière #{subject_id} : {stored or '-'} au lieu de {expected or '-'}"
+                )
+            style = self.style.WARNING if drift else self.style.SUCCESS
+            self.stdout.write(style(f"{len(drift)} bilan(s) à corriger"))
+            return
+
+        count = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f"{count} bilan(s) reconstruit(s)"))
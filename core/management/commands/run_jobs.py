@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from core.jobs import claim_next_job, heartbeat_jobs, init_worker_process, run_job
+from core.models import Job
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches en attente (importations, groupes, PDF) dans un pool de processus."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Nombre de processus.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Délai entre deux scrutations (s).")
+        parser.add_argument('--once', action='store_true', help="S'arrêter quand la file est vide.")
+
+    def _start_pool(self, workers):
+        # Fermer les connexions avant de créer les processus
+        connections.close_all()
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker_process)
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        running = {}
+
+        pool = self._start_pool(workers)
+        try:
+            while True:
+                while len(running) < workers:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    try:
+                        future = pool.submit(run_job, job_id)
+                    except BrokenProcessPool:
+                        # Un processus du pool est mort : la tâche n'a pas démarré, elle
+                        # retourne en attente et sera reprise par un nouveau pool
+                        Job.objects.filter(id=job_id, status='running').update(
+                            status='pending', attempts=F('attempts') - 1
+                        )
+                        self.stderr.write("Pool de processus interrompu, redémarrage")
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self._start_pool(workers)
+                        continue
+                    running[future] = job_id
+                    self.stdout.write(f"Tâche #{job_id} démarrée")
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                heartbeat_jobs(list(running.values()))
+                done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        # Le processus a été interrompu : ne pas laisser la tâche "en cours"
+                        Job.objects.filter(id=job_id, status='running').update(
+                            status='failed', error=str(e), finished_at=timezone.now()
+                        )
+                        status = 'failed'
+                    self.stdout.write(f"Tâche #{job_id} terminée: {status}")
+        finally:
+            pool.shutdown()
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.notifications import NOTIFICATION_BATCH_SIZE, dispatch_notifications
+
+
+class Command(BaseCommand):
+    help = "Envoie les notifications en attente, regroupées par destinataire, sur une seule connexion."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=NOTIFICATION_BATCH_SIZE, help="Notifications par lot.")
+        parser.add_argument('--poll-interval', type=float, default=30.0, help="Délai entre deux scrutations (s).")
+        parser.add_argument('--once', action='store_true', help="S'arrêter quand il n'y a plus rien à envoyer.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = dispatch_notifications(batch_size=options['batch_size'])
+            if result.sent or result.retried or result.failed:
+                self.stdout.write(
+                    f"{result.digests} courriel(s) pour {result.sent} notification(s), "
+                    f"{result.retried} à retenter, {result.failed} en échec définitif"
+                )
+                if result.sent:
+                    continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,156 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Subject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom de la matière')),
+                ('code', models.CharField(max_length=20, unique=True, verbose_name='Code')),
+                ('teacher', models.CharField(max_length=100, verbose_name='Enseignant')),
+                ('teacher_email', models.EmailField(max_length=254, verbose_name='Email enseignant')),
+            ],
+            options={
+                'verbose_name': 'Matière',
+                'verbose_name_plural': 'Matières',
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('start_time', models.TimeField(verbose_name='Heure de début')),
+                ('end_time', models.TimeField(verbose_name='Heure de fin')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notes', models.TextField(blank=True, verbose_name='Notes')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.subject', verbose_name='Matière')),
+            ],
+            options={
+                'verbose_name': 'Session de présence',
+                'verbose_name_plural': 'Sessions de présence',
+                'ordering': ['-date', '-start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DirectorComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment', models.TextField(verbose_name='Commentaire')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('attendance_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.attendancesession')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Commentaire directeur',
+                'verbose_name_plural': 'Commentaires directeur',
+            },
+        ),
+        migrations.CreateModel(
+            name='Student',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=100, verbose_name='Prénom(s)')),
+                ('last_name', models.CharField(max_length=100, verbose_name='Nom(s)')),
+                ('filiere', models.CharField(choices=[('informatique', 'Informatique'), ('mathematiques', 'Mathématiques'), ('physique', 'Physique'), ('chimie', 'Chimie'), ('biologie', 'Biologie'), ('economie', 'Économie'), ('gestion', 'Gestion')], max_length=50, verbose_name='Filière')),
+                ('student_id', models.CharField(max_length=20, unique=True, verbose_name='Numéro étudiant')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='Email')),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Étudiant',
+                'verbose_name_plural': 'Étudiants',
+                'ordering': ['last_name', 'first_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_type', models.CharField(choices=[('student', 'Étudiant'), ('delegate', 'Délégué'), ('director', 'Directeur des Études')], max_length=20)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WorkGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom du groupe')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('is_mixed', models.BooleanField(default=False, verbose_name='Groupes mixtes')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+                ('students', models.ManyToManyField(to='core.student', verbose_name='Étudiants')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.subject', verbose_name='Matière')),
+            ],
+            options={
+                'verbose_name': 'Groupe de travail',
+                'verbose_name_plural': 'Groupes de travail',
+            },
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Titre du projet')),
+                ('description', models.TextField(verbose_name='Description')),
+                ('project_type', models.CharField(choices=[('individual', 'Individuel'), ('group', 'Groupe')], max_length=20, verbose_name='Type')),
+                ('due_date', models.DateTimeField(verbose_name='Date limite')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.subject', verbose_name='Matière')),
+                ('work_group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.workgroup', verbose_name='Groupe de travail')),
+            ],
+            options={
+                'verbose_name': 'Projet',
+                'verbose_name_plural': 'Projets',
+                'ordering': ['due_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='submissions/', verbose_name='Fichier')),
+                ('submitted_at', models.DateTimeField(auto_now_add=True, verbose_name='Soumis le')),
+                ('notes', models.TextField(blank=True, verbose_name='Notes')),
+                ('is_validated', models.BooleanField(default=False, verbose_name='Validé')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.project', verbose_name='Projet')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student', verbose_name='Étudiant')),
+            ],
+            options={
+                'verbose_name': 'Soumission de projet',
+                'verbose_name_plural': 'Soumissions de projet',
+                'unique_together': {('project', 'student')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Attendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_present', models.BooleanField(default=False, verbose_name='Présent')),
+                ('notes', models.TextField(blank=True, verbose_name='Remarques')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.attendancesession')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student')),
+            ],
+            options={
+                'verbose_name': 'Présence',
+                'verbose_name_plural': 'Présences',
+                'unique_together': {('session', 'student')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('import_students', 'Importation des étudiants'), ('create_groups', 'Création des groupes'), ('attendance_pdf', 'Liste de présence PDF'), ('attendance_export', 'Export des listes de présence')], max_length=50, verbose_name='Type')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], default='pending', max_length=20, verbose_name='Statut')),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('progress', models.PositiveIntegerField(default=0, verbose_name='Progression')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total')),
+                ('input_file', models.FileField(blank=True, upload_to='jobs/input/', verbose_name="Fichier d'entrée")),
+                ('output_file', models.FileField(blank=True, upload_to='jobs/output/', verbose_name='Fichier produit')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Démarré le')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernier signe de vie')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentatives')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminé le')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+            ],
+            options={
+                'verbose_name': 'Tâche',
+                'verbose_name_plural': 'Tâches',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_job_status_38dcf0_idx')],
+            },
+        ),
+    ]
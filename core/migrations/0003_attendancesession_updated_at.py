@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesession',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modifié le'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:23
+
+import core.storage
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Fichier')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Taille')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='Références')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Fichier stocké',
+                'verbose_name_plural': 'Fichiers stockés',
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='core_stored_ref_cou_ceecf8_idx')],
+            },
+        ),
+        migrations.AlterField(
+            model_name='projectsubmission',
+            name='file',
+            field=models.FileField(storage=core.storage.ContentAddressedStorage(), upload_to='submissions/', verbose_name='Fichier'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_storedfile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectsubmission',
+            name='submitted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Soumis le'),
+        ),
+    ]
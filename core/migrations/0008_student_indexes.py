@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_projectsubmission_submitted_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name', 'first_name'], name='core_studen_last_na_d07597_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['filiere', 'last_name', 'first_name'], name='core_studen_filiere_7e50fb_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_summaries(apps, schema_editor):
+    """Bilans de présence des données existantes."""
+    Attendance = apps.get_model('core', 'Attendance')
+    AttendanceSummary = apps.get_model('core', 'AttendanceSummary')
+
+    rows = Attendance.objects.order_by().values('student_id', 'session__subject_id').annotate(
+        n_present=Count('id', filter=Q(is_present=True)),
+        n_absent=Count('id', filter=Q(is_present=False)),
+    )
+    AttendanceSummary.objects.bulk_create(
+        [
+            AttendanceSummary(
+                student_id=row['student_id'], subject_id=row['session__subject_id'],
+                present=row['n_present'], absent=row['n_absent'],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_student_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.IntegerField(default=0, verbose_name='Présences')),
+                ('absent', models.IntegerField(default=0, verbose_name='Absences')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student', verbose_name='Étudiant')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.subject', verbose_name='Matière')),
+            ],
+            options={
+                'verbose_name': 'Bilan de présence',
+                'verbose_name_plural': 'Bilans de présence',
+                'indexes': [models.Index(fields=['subject', 'absent'], name='core_attend_subject_374220_idx')],
+                'unique_together': {('student', 'subject')},
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
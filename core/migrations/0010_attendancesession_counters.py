@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:23
+
+from django.db import migrations, models
+from django.db.models import IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset):
+    return Coalesce(Subquery(
+        queryset.order_by().values('pk').annotate(n=models.Func('pk', function='COUNT')).values('n')[:1],
+        output_field=IntegerField(),
+    ), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    """Compteurs de session des données existantes."""
+    AttendanceSession = apps.get_model('core', 'AttendanceSession')
+    Attendance = apps.get_model('core', 'Attendance')
+    DirectorComment = apps.get_model('core', 'DirectorComment')
+
+    AttendanceSession.objects.update(
+        total_count=_count(Attendance.objects.filter(session=OuterRef('pk'))),
+        present_count=_count(Attendance.objects.filter(session=OuterRef('pk'), is_present=True)),
+        comment_count=_count(DirectorComment.objects.filter(attendance_session=OuterRef('pk'))),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesession',
+            name='comment_count',
+            field=models.IntegerField(default=0, verbose_name='Commentaires'),
+        ),
+        migrations.AddField(
+            model_name='attendancesession',
+            name='present_count',
+            field=models.IntegerField(default=0, verbose_name='Présents'),
+        ),
+        migrations.AddField(
+            model_name='attendancesession',
+            name='total_count',
+            field=models.IntegerField(default=0, verbose_name='Inscrits'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(condition=models.Q(('comment_count', 0)), fields=['-date', '-start_time'], name='core_session_pending_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
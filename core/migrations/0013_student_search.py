@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:02
+
+from django.db import DatabaseError, migrations, transaction
+
+
+FTS_TABLE = 'core_student_fts'
+SEARCH_FIELDS = ['last_name', 'first_name', 'student_id', 'email']
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        last_name, first_name, student_id, email,
+        content='core_student', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON core_student BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, last_name, first_name, student_id, email)
+        VALUES (new.id, new.last_name, new.first_name, new.student_id, new.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON core_student BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, last_name, first_name, student_id, email)
+        VALUES ('delete', old.id, old.last_name, old.first_name, old.student_id, old.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON core_student BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, last_name, first_name, student_id, email)
+        VALUES ('delete', old.id, old.last_name, old.first_name, old.student_id, old.email);
+        INSERT INTO {FTS_TABLE}(rowid, last_name, first_name, student_id, email)
+        VALUES (new.id, new.last_name, new.first_name, new.student_id, new.email);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_FORWARD = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS core_student_{name}_trgm ON core_student USING gin (UPPER({name}) gin_trgm_ops)"
+    for name in SEARCH_FIELDS
+]
+POSTGRES_BACKWARD = [f"DROP INDEX IF EXISTS core_student_{name}_trgm" for name in SEARCH_FIELDS]
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL appliqué à un seul moteur ; un échec (FTS5 non compilé, pg_trgm non autorisé) est ignoré."""
+
+    def __init__(self, vendor, sql, reverse_sql):
+        super().__init__(sql, reverse_sql)
+        self.vendor = vendor
+
+    def _run(self, method, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != self.vendor:
+            return
+        try:
+            # Point de sauvegarde : un échec n'interrompt pas la migration (recherche sans index)
+            with transaction.atomic(using=schema_editor.connection.alias):
+                method(app_label, schema_editor, from_state, to_state)
+        except DatabaseError:
+            pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._run(super().database_forwards, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._run(super().database_backwards, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    """Recherche d'étudiants : table FTS5 et déclencheurs (SQLite), index trigrammes (PostgreSQL)."""
+
+    dependencies = [
+        ('core', '0012_userprofile_role_version'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE_FORWARD, SQLITE_BACKWARD),
+        VendorRunSQL('postgresql', POSTGRES_FORWARD, POSTGRES_BACKWARD),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_student_search'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='role_version',
+        ),
+    ]
@@ -1,7 +1,11 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .storage import submission_storage
+
 
 class UserProfile(models.Model):
     USER_TYPES = [
@@ -57,6 +61,11 @@ class Student(models.Model):
         verbose_name = "Étudiant"
         verbose_name_plural = "Étudiants"
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Liste triée, complète ou filtrée par filière
+            models.Index(fields=['last_name', 'first_name']),
+            models.Index(fields=['filiere', 'last_name', 'first_name']),
+        ]
 
 
 class WorkGroup(models.Model):
@@ -82,15 +91,49 @@ class AttendanceSession(models.Model):
     end_time = models.TimeField(verbose_name="Heure de fin")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Créé par")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
     notes = models.TextField(blank=True, verbose_name="Notes")
+    # Compteurs tenus à jour avec les présences et commentaires (voir attendance.touch_session)
+    present_count = models.IntegerField(default=0, verbose_name="Présents")
+    total_count = models.IntegerField(default=0, verbose_name="Inscrits")
+    comment_count = models.IntegerField(default=0, verbose_name="Commentaires")
+    
+    COUNTER_FIELDS = ('present_count', 'total_count', 'comment_count')
     
     def __str__(self):
         return f"{self.subject.name} - {self.date}"
     
+    def save(self, *args, **kwargs):
+        # Les compteurs ne sont modifiés que par UPDATE ... F() : une sauvegarde
+        # complète ne doit pas réécrire les valeurs lues plus tôt
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    @property
+    def absent_count(self):
+        return self.total_count - self.present_count
+    
+    @property
+    def has_comment(self):
+        return self.comment_count > 0
+    
     class Meta:
         verbose_name = "Session de présence"
         verbose_name_plural = "Sessions de présence"
         ordering = ['-date', '-start_time']
+        indexes = [
+            models.Index(fields=['subject', 'date']),
+            models.Index(fields=['date', 'start_time']),
+            # Sessions en attente de commentaire, dans l'ordre de la liste du directeur
+            models.Index(
+                fields=['-date', '-start_time'], condition=models.Q(comment_count=0),
+                name='core_session_pending_idx',
+            ),
+        ]
 
 
 class Attendance(models.Model):
@@ -109,6 +152,29 @@ class Attendance(models.Model):
         unique_together = ['session', 'student']
 
 
+class AttendanceSummary(models.Model):
+    """Bilan des présences d'un étudiant dans une matière, maintenu à chaque appel."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, verbose_name="Étudiant")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, verbose_name="Matière")
+    present = models.IntegerField(default=0, verbose_name="Présences")
+    absent = models.IntegerField(default=0, verbose_name="Absences")
+    
+    def __str__(self):
+        return f"{self.student} - {self.subject.name} ({self.present}/{self.total})"
+    
+    @property
+    def total(self):
+        return self.present + self.absent
+    
+    class Meta:
+        verbose_name = "Bilan de présence"
+        verbose_name_plural = "Bilans de présence"
+        unique_together = ['student', 'subject']
+        indexes = [
+            models.Index(fields=['subject', 'absent']),
+        ]
+
+
 class Project(models.Model):
     PROJECT_TYPES = [
         ('individual', 'Individuel'),
@@ -136,8 +202,9 @@ class Project(models.Model):
 class ProjectSubmission(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, verbose_name="Projet")
     student = models.ForeignKey(Student, on_delete=models.CASCADE, verbose_name="Étudiant")
-    file = models.FileField(upload_to='submissions/', verbose_name="Fichier")
-    submitted_at = models.DateTimeField(auto_now_add=True, verbose_name="Soumis le")
+    file = models.FileField(upload_to='submissions/', storage=submission_storage, verbose_name="Fichier")
+    # Heure de réception de l'envoi, fixée avant la mise en attente
+    submitted_at = models.DateTimeField(default=timezone.now, verbose_name="Soumis le")
     notes = models.TextField(blank=True, verbose_name="Notes")
     is_validated = models.BooleanField(default=False, verbose_name="Validé")
     
@@ -150,6 +217,56 @@ class ProjectSubmission(models.Model):
         unique_together = ['project', 'student']
 
 
+class StoredFile(models.Model):
+    """Fichier de soumission stocké par empreinte, avec son nombre de références."""
+    name = models.CharField(max_length=255, unique=True, verbose_name="Fichier")
+    size = models.PositiveBigIntegerField(default=0, verbose_name="Taille")
+    ref_count = models.IntegerField(default=0, verbose_name="Références")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="Modifié le")
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+    
+    class Meta:
+        verbose_name = "Fichier stocké"
+        verbose_name_plural = "Fichiers stockés"
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at']),
+        ]
+
+
+class UploadSession(models.Model):
+    """Téléversement découpé en morceaux d'un fichier de soumission, reprenable."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, verbose_name="Projet")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, verbose_name="Étudiant")
+    filename = models.CharField(max_length=255, verbose_name="Nom du fichier")
+    size = models.PositiveBigIntegerField(verbose_name="Taille")
+    received = models.PositiveBigIntegerField(default=0, verbose_name="Octets reçus")
+    # Morceau en cours d'écriture : posé avant d'écrire, levé une fois le décalage validé
+    writing_since = models.DateTimeField(null=True, blank=True)
+    expected_sha256 = models.CharField(max_length=64, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    notes = models.TextField(blank=True, verbose_name="Notes")
+    submission = models.ForeignKey(ProjectSubmission, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+    
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
+    
+    class Meta:
+        verbose_name = "Téléversement"
+        verbose_name_plural = "Téléversements"
+        indexes = [
+            models.Index(fields=['project', 'student', 'filename']),
+        ]
+
+
 class DirectorComment(models.Model):
     attendance_session = models.ForeignKey(AttendanceSession, on_delete=models.CASCADE)
     comment = models.TextField(verbose_name="Commentaire")
@@ -161,4 +278,89 @@ class DirectorComment(models.Model):
     
     class Meta:
         verbose_name = "Commentaire directeur"
-        verbose_name_plural = "Commentaires directeur"
\ No newline at end of file
+        verbose_name_plural = "Commentaires directeur"
+
+
+class Job(models.Model):
+    KINDS = [
+        ('import_students', 'Importation des étudiants'),
+        ('create_groups', 'Création des groupes'),
+        ('attendance_pdf', 'Liste de présence PDF'),
+        ('attendance_export', 'Export des listes de présence'),
+    ]
+    STATUSES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+    
+    kind = models.CharField(max_length=50, choices=KINDS, verbose_name="Type")
+    status = models.CharField(max_length=20, choices=STATUSES, default='pending', verbose_name="Statut")
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, verbose_name="Erreur")
+    progress = models.PositiveIntegerField(default=0, verbose_name="Progression")
+    total = models.PositiveIntegerField(default=0, verbose_name="Total")
+    input_file = models.FileField(upload_to='jobs/input/', blank=True, verbose_name="Fichier d'entrée")
+    output_file = models.FileField(upload_to='jobs/output/', blank=True, verbose_name="Fichier produit")
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Créé par")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Démarré le")
+    # Renouvelé par run_jobs tant que la tâche s'exécute (voir jobs.recover_stale_jobs)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Dernier signe de vie")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Tentatives")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Terminé le")
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_status_display()})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+    
+    class Meta:
+        verbose_name = "Tâche"
+        verbose_name_plural = "Tâches"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+
+class Notification(models.Model):
+    """Message en attente d'envoi ; regroupé par destinataire dans un seul courriel."""
+    KINDS = [
+        ('absence_student', 'Absence (étudiant)'),
+        ('absence_teacher', 'Absence (enseignant)'),
+    ]
+    STATUSES = [
+        ('pending', 'En attente'),
+        ('sending', 'En cours d\'envoi'),
+        ('sent', 'Envoyé'),
+        ('failed', 'Échec'),
+    ]
+    
+    kind = models.CharField(max_length=30, choices=KINDS, verbose_name="Type")
+    recipient = models.EmailField(verbose_name="Destinataire")
+    message = models.TextField(verbose_name="Message")
+    session = models.ForeignKey(AttendanceSession, on_delete=models.CASCADE, null=True, blank=True)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='pending', verbose_name="Statut")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Tentatives")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Prochain essai")
+    last_error = models.TextField(blank=True, verbose_name="Dernière erreur")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Envoyé le")
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} -> {self.recipient} ({self.get_status_display()})"
+    
+    class Meta:
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        ordering = ['created_at']
+        unique_together = ['kind', 'recipient', 'session', 'student']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
@@ -0,0 +1,183 @@
+"""
+Boîte d'envoi des alertes d'absence.
+
+Les alertes sont enregistrées pendant l'appel (un INSERT groupé) puis envoyées
+par la commande send_notifications : un courriel récapitulatif par destinataire,
+tous sur la même connexion SMTP, avec nouvel essai espacé en cas d'échec.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attendance, Notification
+
+
+# Délai laissé au délégué pour corriger l'appel avant l'envoi des alertes
+ABSENCE_ALERT_DELAY = timedelta(minutes=30)
+
+NOTIFICATION_BATCH_SIZE = 500
+NOTIFICATION_MAX_ATTEMPTS = 5
+# Premier nouvel essai après 1 min, puis 2, 4, 8... (plafonné)
+NOTIFICATION_RETRY_BASE = timedelta(minutes=1)
+NOTIFICATION_RETRY_MAX = timedelta(hours=6)
+# Durée de réservation d'un lot : au-delà, un autre envoi peut le reprendre
+NOTIFICATION_LEASE = timedelta(minutes=10)
+
+DIGEST_SUBJECTS = {
+    'absence_student': "Absence enregistrée",
+    'absence_teacher': "Absences enregistrées",
+}
+
+
+def _session_label(session):
+    return (
+        f"{session.subject.name} ({session.subject.code}) le {session.date.strftime('%d/%m/%Y')} "
+        f"de {session.start_time.strftime('%H:%M')} à {session.end_time.strftime('%H:%M')}"
+    )
+
+
+def queue_absence_alerts(session, attendance_ids=None):
+    """
+    Met à jour les alertes en attente de la session d'après l'appel actuel.
+
+    Les étudiants repassés présents perdent leur alerte non envoyée ; les absents
+    sans alerte en reçoivent une (étudiant et enseignant de la matière).
+    `attendance_ids` limite la mise à jour aux présences modifiées (pointage
+    unitaire) ; sans lui, toute la session est reprise. Tant qu'aucune alerte
+    n'existe pour la session, elle est aussi reprise en entier : les étudiants
+    laissés absents par défaut, jamais pointés, reçoivent alors leur alerte.
+    """
+    if not settings.ABSENCE_ALERTS_ENABLED:
+        return
+    attendances = Attendance.objects.filter(session=session)
+    if attendance_ids is not None and Notification.objects.filter(session=session).exists():
+        attendances = attendances.filter(id__in=attendance_ids)
+    now = timezone.now()
+    with transaction.atomic():
+        Notification.objects.filter(
+            session=session, status='pending', kind__in=DIGEST_SUBJECTS,
+            student__in=attendances.filter(is_present=True).values('student_id'),
+        ).delete()
+
+        label = _session_label(session)
+        teacher_email = session.subject.teacher_email
+        alerts = []
+        for attendance in attendances.filter(is_present=False).select_related('student').iterator():
+            student = attendance.student
+            if student.email:
+                alerts.append(Notification(
+                    kind='absence_student', recipient=student.email, session=session, student=student,
+                    message=label, next_attempt_at=now + ABSENCE_ALERT_DELAY,
+                ))
+            if teacher_email:
+                alerts.append(Notification(
+                    kind='absence_teacher', recipient=teacher_email, session=session, student=student,
+                    message=f"{label} : {student.last_name} {student.first_name} ({student.student_id})",
+                    next_attempt_at=now + ABSENCE_ALERT_DELAY,
+                ))
+        if alerts:
+            # Les alertes déjà en file sont ignorées (kind, recipient, session, student uniques)
+            Notification.objects.bulk_create(alerts, batch_size=NOTIFICATION_BATCH_SIZE, ignore_conflicts=True)
+
+
+def claim_notifications(batch_size=NOTIFICATION_BATCH_SIZE, now=None):
+    """Réserve les notifications dues (ou dont la réservation a expiré)."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = Notification.objects.filter(
+            status__in=['pending', 'sending'], next_attempt_at__lte=now
+        ).order_by('recipient', 'created_at')
+        ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+        Notification.objects.filter(id__in=ids).update(status='sending', next_attempt_at=now + NOTIFICATION_LEASE)
+    return list(Notification.objects.filter(id__in=ids).order_by('recipient', 'kind', 'created_at'))
+
+
+def build_digest(recipient, notifications):
+    """Un courriel regroupant toutes les notifications d'un destinataire."""
+    by_kind = defaultdict(list)
+    for notification in notifications:
+        by_kind[notification.kind].append(notification.message)
+
+    sections = []
+    for kind, lines in by_kind.items():
+        sections.append(f"{DIGEST_SUBJECTS[kind]} :\n" + "\n".join(f"- {line}" for line in lines))
+    subject = DIGEST_SUBJECTS[notifications[0].kind] if len(by_kind) == 1 else "Absences"
+    body = "Bonjour,\n\n" + "\n\n".join(sections) + "\n\nCe message est envoyé automatiquement."
+    return EmailMessage(f"{subject} ({len(notifications)})", body, settings.DEFAULT_FROM_EMAIL, [recipient])
+
+
+def retry_delay(attempts):
+    return min(NOTIFICATION_RETRY_BASE * (2 ** (attempts - 1)), NOTIFICATION_RETRY_MAX)
+
+
+def _mark_failed(notifications, error, now):
+    for notification in notifications:
+        notification.attempts += 1
+        notification.last_error = error
+        if notification.attempts >= NOTIFICATION_MAX_ATTEMPTS:
+            notification.status = 'failed'
+        else:
+            notification.status = 'pending'
+            notification.next_attempt_at = now + retry_delay(notification.attempts)
+    Notification.objects.bulk_update(notifications, ['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+@dataclass
+class DispatchResult:
+    digests: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+def dispatch_notifications(batch_size=NOTIFICATION_BATCH_SIZE, connection=None):
+    """
+    Envoie un lot de notifications dues, un récapitulatif par destinataire.
+
+    Une seule connexion est ouverte pour tout le lot ; un échec n'affecte que
+    le destinataire concerné, qui sera retenté plus tard (délai exponentiel).
+    """
+    result = DispatchResult()
+    notifications = claim_notifications(batch_size)
+    if not notifications:
+        return result
+
+    by_recipient = defaultdict(list)
+    for notification in notifications:
+        by_recipient[notification.recipient].append(notification)
+
+    now = timezone.now()
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Serveur injoignable : tout le lot est retenté plus tard
+        _mark_failed(notifications, str(e), now)
+        result.retried = sum(1 for n in notifications if n.status == 'pending')
+        result.failed = len(notifications) - result.retried
+        return result
+
+    sent = []
+    try:
+        for recipient, items in by_recipient.items():
+            try:
+                connection.send_messages([build_digest(recipient, items)])
+            except Exception as e:
+                _mark_failed(items, str(e), now)
+                result.retried += sum(1 for n in items if n.status == 'pending')
+                result.failed += sum(1 for n in items if n.status == 'failed')
+                continue
+            result.digests += 1
+            sent.extend(n.id for n in items)
+    finally:
+        connection.close()
+
+    result.sent = Notification.objects.filter(id__in=sent).update(
+        status='sent', sent_at=timezone.now(), last_error=''
+    )
+    return result
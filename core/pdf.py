@@ -0,0 +1,208 @@
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from pypdf import PdfWriter
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.units import inch
+
+from .models import Attendance, Student
+
+
+# Nombre de lignes par tableau : un tableau par page environ, l'en-tête est répété
+ROWS_PER_TABLE = 40
+
+TABLE_HEADER = ['#', 'Nom', 'Prénom', 'Filière', 'Présence', 'Signature']
+TABLE_COL_WIDTHS = [0.5*inch, 1.5*inch, 1.5*inch, 1.2*inch, 0.8*inch, 1.5*inch]
+
+
+def attendance_pdf_filename(session):
+    return f"presence_{session.subject.code}_{session.date}.pdf"
+
+
+@lru_cache(maxsize=None)
+def _pdf_styles():
+    """Styles construits une seule fois par processus."""
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1,  # Center
+        textColor=colors.darkblue
+    )
+    info_style = ParagraphStyle(
+        'InfoStyle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=20
+    )
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ])
+    return title_style, info_style, table_style
+
+
+def _attendance_table(rows, table_style):
+    table = Table([TABLE_HEADER] + rows, colWidths=TABLE_COL_WIDTHS, repeatRows=1)
+    table.setStyle(table_style)
+    return table
+
+
+def attendance_story(session):
+    """Flowables ReportLab de la liste de présence de `session`."""
+    title_style, info_style, table_style = _pdf_styles()
+    story = []
+
+    # Titre
+    title = f"Liste de Présence - {session.subject.name}"
+    story.append(Paragraph(title, title_style))
+
+    # Informations de la session
+    info_text = f"""
+    <b>Matière:</b> {session.subject.name} ({session.subject.code})<br/>
+    <b>Enseignant:</b> {session.subject.teacher}<br/>
+    <b>Date:</b> {session.date.strftime('%d/%m/%Y')}<br/>
+    <b>Horaire:</b> {session.start_time.strftime('%H:%M')} - {session.end_time.strftime('%H:%M')}<br/>
+    <b>Délégué:</b> {session.created_by.get_full_name()}<br/>
+    """
+
+    story.append(Paragraph(info_text, info_style))
+    story.append(Spacer(1, 20))
+
+    # Tableaux des présences, découpés en blocs ; les statistiques sont
+    # calculées pendant ce même parcours
+    attendances = Attendance.objects.filter(session=session).select_related('student').order_by(
+        'student__last_name', 'student__first_name', 'id'
+    )
+
+    total_students = 0
+    present_count = 0
+    rows = []
+    for i, attendance in enumerate(attendances.iterator(chunk_size=ROWS_PER_TABLE * 10), 1):
+        total_students += 1
+        if attendance.is_present:
+            present_count += 1
+        rows.append([
+            str(i),
+            attendance.student.last_name,
+            attendance.student.first_name,
+            attendance.student.get_filiere_display(),
+            '✓' if attendance.is_present else '✗',
+            ''  # Colonne pour signature
+        ])
+        if len(rows) == ROWS_PER_TABLE:
+            story.append(_attendance_table(rows, table_style))
+            rows = []
+
+    if rows or not total_students:
+        story.append(_attendance_table(rows, table_style))
+
+    # Statistiques
+    absent_count = total_students - present_count
+
+    story.append(Spacer(1, 30))
+    stats_text = f"""
+    <b>Statistiques:</b><br/>
+    Total étudiants: {total_students}<br/>
+    Présents: {present_count}<br/>
+    Absents: {absent_count}<br/>
+    Taux de présence: {(present_count/total_students*100) if total_students > 0 else 0:.1f}%
+    """
+
+    story.append(Paragraph(stats_text, info_style))
+
+    # Notes si présentes
+    if session.notes:
+        story.append(Spacer(1, 20))
+        notes_text = f"<b>Notes:</b><br/>{session.notes}"
+        story.append(Paragraph(notes_text, info_style))
+
+    return story
+
+
+def build_attendance_pdf(session, output):
+    """Écrit la liste de présence de `session` au format PDF dans `output`."""
+    SimpleDocTemplate(output, pagesize=A4).build(attendance_story(session))
+
+
+def merge_attendance_pdfs(paths, output):
+    """
+    Concatène des PDF de session (en cache) dans `output`, page par page ;
+    retourne le nombre de sessions. Sans session, une page l'indique.
+    """
+    writer = PdfWriter()
+    count = 0
+    for path in paths:
+        writer.append(str(path))
+        count += 1
+    if not count:
+        SimpleDocTemplate(output, pagesize=A4).build([Paragraph("Aucune session.", _pdf_styles()[1])])
+        return 0
+    writer.write(output)
+    return count
+
+
+def _cache_dir():
+    return Path(settings.ATTENDANCE_PDF_CACHE_DIR)
+
+
+def attendance_pdf_cache_path(session):
+    """
+    Chemin du PDF en cache, versionné par tout ce qui figure dans le document.
+
+    La session (présences, notes, horaires, et noms ou filières des étudiants
+    via attendance.touch_student_sessions) est couverte par `updated_at` ; la
+    matière, le délégué et les libellés de filière sont ajoutés à la version.
+    """
+    subject = session.subject
+    key = '|'.join([
+        session.updated_at.isoformat(), subject.name, subject.code, subject.teacher,
+        session.created_by.get_full_name(), repr(Student.FILIERE_CHOICES),
+    ])
+    version = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return _cache_dir() / f"session_{session.id}_{version}.pdf"
+
+
+def cached_attendance_pdf(session):
+    """Retourne le chemin du PDF en cache s'il est à jour, sinon None."""
+    path = attendance_pdf_cache_path(session)
+    return path if path.exists() else None
+
+
+def render_attendance_pdf(session):
+    """Génère le PDF dans le cache (écriture atomique) et supprime les versions périmées."""
+    path = attendance_pdf_cache_path(session)
+    if path.exists():
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            build_attendance_pdf(session, output)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+    for stale in path.parent.glob(f"session_{session.id}_*.pdf"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path
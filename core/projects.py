@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.db.models import BooleanField, Case, CharField, Exists, F, OuterRef, Q, Subquery, Value, When
+from django.utils import timezone
+
+from .models import Project, ProjectSubmission, WorkGroup
+
+
+# Délai en dessous duquel un projet est signalé comme bientôt dû
+DUE_SOON = timedelta(hours=48)
+
+
+def _membership(student_pk, work_group):
+    return WorkGroup.students.through.objects.filter(workgroup_id=work_group, student_id=student_pk)
+
+
+def visible_projects_q(student_pk):
+    """Projets individuels, ou de groupe dont l'étudiant est membre (EXISTS, sans DISTINCT)."""
+    return Q(project_type='individual') | Q(Exists(_membership(student_pk, OuterRef('work_group_id'))))
+
+
+def visible_projects(student_pk, now=None):
+    """
+    Projets visibles par l'étudiant, annotés en une seule requête avec :
+    `group_name`, `submission_id`, `submitted_at`, `is_validated` et `due_state`
+    ('overdue', 'due_soon' ou 'open').
+    """
+    now = now or timezone.now()
+    submission = ProjectSubmission.objects.filter(project=OuterRef('pk'), student_id=student_pk)
+    return Project.objects.filter(visible_projects_q(student_pk)).select_related('subject').annotate(
+        group_name=F('work_group__name'),
+        submission_id=Subquery(submission.values('id')[:1]),
+        submitted_at=Subquery(submission.values('submitted_at')[:1]),
+        is_validated=Subquery(submission.values('is_validated')[:1], output_field=BooleanField()),
+        due_state=Case(
+            When(due_date__lt=now, then=Value('overdue')),
+            When(due_date__lt=now + DUE_SOON, then=Value('due_soon')),
+            default=Value('open'),
+            output_field=CharField(),
+        ),
+    )
+
+
+def can_submit_project(project, student_pk):
+    """Autorisation de soumission : projet individuel ou appartenance au groupe (EXISTS indexé)."""
+    if project.project_type == 'individual':
+        return True
+    if not project.work_group_id:
+        return False
+    return _membership(student_pk, project.work_group_id).exists()
@@ -0,0 +1,113 @@
+import uuid
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+from .models import UserProfile
+
+
+ROLE_SESSION_KEY = '_core_role'
+ROLE_DISPLAY = dict(UserProfile.USER_TYPES)
+
+
+def _version_key(user_id):
+    return f'core:role-version:{user_id}'
+
+
+def role_version(user_id):
+    """Jeton de version du rôle en cache ; None s'il a été évincé ou jamais posé."""
+    return cache.get(_version_key(user_id))
+
+
+def _current_version(user_id):
+    # Jeton absent : on en pose un nouveau, qu'aucune session ne porte encore.
+    # add ne remplace pas le jeton d'une invalidation concurrente.
+    version = uuid.uuid4().hex
+    if not cache.add(_version_key(user_id), version, None):
+        version = cache.get(_version_key(user_id), version)
+    return version
+
+
+def invalidate_role(user_id):
+    """
+    À appeler quand le profil ou l'étudiant lié d'un utilisateur change.
+
+    Le nouveau jeton est posé après validation de la transaction : une session
+    rechargée entre-temps aurait lu l'ancien état sous le nouveau jeton.
+    """
+    transaction.on_commit(lambda: cache.set(_version_key(user_id), uuid.uuid4().hex, None))
+
+
+def load_role(user_id):
+    """Charge le type de profil et l'étudiant lié de l'utilisateur en une seule requête."""
+    # Jeton lu avant les données : une invalidation intercalée le rend aussitôt périmé
+    version = _current_version(user_id)
+    user_type, student_pk = User.objects.filter(pk=user_id).values_list(
+        'userprofile__user_type', 'student__pk'
+    ).first() or (None, None)
+    return {
+        'user_id': user_id,
+        'user_type': user_type,
+        'student_pk': student_pk,
+        'version': version,
+    }
+
+
+class RoleMiddleware:
+    """
+    Résout le rôle de l'utilisateur connecté (`request.role`, `request.student_pk`).
+
+    Le résultat est conservé dans la session avec le jeton de version du cache,
+    sans requête tant que les deux correspondent. Il est rechargé quand le jeton
+    change (voir `invalidate_role`) ou a disparu du cache : un jeton manquant ne
+    correspond jamais.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.role = None
+        request.student_pk = None
+        if request.user.is_authenticated:
+            user_id = request.user.pk
+            cached = request.session.get(ROLE_SESSION_KEY)
+            version = role_version(user_id)
+            if (not cached or version is None or cached['user_id'] != user_id
+                    or cached['version'] != version):
+                cached = load_role(user_id)
+                request.session[ROLE_SESSION_KEY] = cached
+            request.role = cached['user_type']
+            request.student_pk = cached['student_pk']
+        return self.get_response(request)
+
+
+def role_required(*roles, api=False):
+    """Restreint une vue aux rôles donnés (`@role_required('delegate')`)."""
+    def decorator(view_func):
+        @wraps(view_func)
+        @login_required
+        def wrapper(request, *args, **kwargs):
+            if request.role not in roles:
+                if api:
+                    return JsonResponse({'error': 'Accès non autorisé.'}, status=403)
+                messages.error(request, 'Accès non autorisé.')
+                return redirect('dashboard')
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def role_context(request):
+    """Context processor : rôle courant pour les gabarits."""
+    role = getattr(request, 'role', None)
+    return {
+        'user_role': role,
+        'user_role_display': ROLE_DISPLAY.get(role, ''),
+    }
@@ -0,0 +1,171 @@
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from .attendance import touch_session, touch_student_sessions
+from .models import (
+    Attendance, AttendanceSession, DirectorComment, Project, ProjectSubmission, Student, Subject,
+    UserProfile, WorkGroup
+)
+from .roles import invalidate_role
+from .stats import invalidate_dashboard_stats
+from .stored_files import release_file, retain_file
+from .students import install_student_search
+from .summaries import move_session_summaries, record_attendance
+
+
+def _attendance_subject_id(session_id):
+    return AttendanceSession.objects.filter(id=session_id).values_list('subject_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Attendance)
+def attendance_before_save(sender, instance, **kwargs):
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Attendance.objects.filter(pk=instance.pk).values_list(
+            'session_id', 'session__subject_id', 'student_id', 'is_present'
+        ).first()
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    # Écritures unitaires (admin) ; les chemins groupés (bulk_create / update)
+    # tiennent eux-mêmes compteurs de session et bilans
+    previous = getattr(instance, '_previous_state', None)
+    if previous and previous[0] == instance.session_id and previous[2:] == (instance.student_id, instance.is_present):
+        touch_session(instance.session_id)
+        return
+
+    if previous:
+        session_id, subject_id, student_id, was_present = previous
+        touch_session(session_id, present=-int(was_present), total=-1)
+        record_attendance(subject_id, student_id, was_present, sign=-1)
+    touch_session(instance.session_id, present=int(instance.is_present), total=1)
+    subject_id = _attendance_subject_id(instance.session_id)
+    if subject_id:
+        record_attendance(subject_id, instance.student_id, instance.is_present)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    touch_session(instance.session_id, present=-int(instance.is_present), total=-1)
+    subject_id = _attendance_subject_id(instance.session_id)
+    if subject_id:
+        record_attendance(subject_id, instance.student_id, instance.is_present, sign=-1)
+
+
+@receiver(pre_save, sender=AttendanceSession)
+def session_before_save(sender, instance, **kwargs):
+    instance._previous_subject_id = None
+    if instance.pk:
+        instance._previous_subject_id = _attendance_subject_id(instance.pk)
+
+
+@receiver(post_save, sender=AttendanceSession)
+def session_saved(sender, instance, created, **kwargs):
+    # Matière modifiée (admin) : les présences déjà comptées changent de bilan
+    previous = getattr(instance, '_previous_subject_id', None)
+    if not created and previous and previous != instance.subject_id:
+        move_session_summaries(instance.pk, previous, instance.subject_id)
+
+
+def _shift_comment_count(session_id, delta):
+    AttendanceSession.objects.filter(id=session_id).update(comment_count=F('comment_count') + delta)
+
+
+@receiver(pre_save, sender=DirectorComment)
+def comment_before_save(sender, instance, **kwargs):
+    instance._previous_session_id = None
+    if instance.pk:
+        instance._previous_session_id = DirectorComment.objects.filter(pk=instance.pk).values_list(
+            'attendance_session_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=DirectorComment)
+def comment_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_session_id', None)
+    if previous == instance.attendance_session_id:
+        return
+    if previous:
+        _shift_comment_count(previous, -1)
+    _shift_comment_count(instance.attendance_session_id, 1)
+
+
+@receiver(post_delete, sender=DirectorComment)
+def comment_deleted(sender, instance, **kwargs):
+    _shift_comment_count(instance.attendance_session_id, -1)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def user_profile_changed(sender, instance, **kwargs):
+    invalidate_role(instance.user_id)
+
+
+# Champs de l'étudiant repris dans les listes de présence PDF
+STUDENT_PDF_FIELDS = ('last_name', 'first_name', 'filiere')
+
+
+@receiver(pre_save, sender=Student)
+def student_before_save(sender, instance, **kwargs):
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Student.objects.filter(pk=instance.pk).values(
+            'user_id', *STUDENT_PDF_FIELDS
+        ).first()
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def student_changed(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_state', None) or {}
+    # Un étudiant relié à un autre compte : l'ancien perd aussi son rôle en cache
+    for user_id in {instance.user_id, previous.get('user_id')}:
+        if user_id:
+            invalidate_role(user_id)
+    if previous and any(previous[name] != getattr(instance, name) for name in STUDENT_PDF_FIELDS):
+        touch_student_sessions([instance.pk])
+
+
+@receiver(pre_save, sender=ProjectSubmission)
+def submission_file_before_save(sender, instance, **kwargs):
+    instance._previous_file = ''
+    if instance.pk:
+        instance._previous_file = (
+            ProjectSubmission.objects.filter(pk=instance.pk).values_list('file', flat=True).first() or ''
+        )
+
+
+@receiver(post_save, sender=ProjectSubmission)
+def submission_file_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_file', '')
+    if instance.file.name != previous:
+        retain_file(instance.file.name)
+        release_file(previous)
+
+
+@receiver(post_delete, sender=ProjectSubmission)
+def submission_deleted(sender, instance, **kwargs):
+    release_file(instance.file.name)
+
+
+DASHBOARD_MODELS = [Student, Subject, WorkGroup, AttendanceSession, DirectorComment, Project]
+
+
+def dashboard_data_changed(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(dashboard_data_changed, sender=model, dispatch_uid=f'dashboard-{model.__name__}-save')
+    post_delete.connect(dashboard_data_changed, sender=model, dispatch_uid=f'dashboard-{model.__name__}-delete')
+m2m_changed.connect(dashboard_data_changed, sender=WorkGroup.students.through, dispatch_uid='dashboard-workgroup-students')
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    # Objets propres à chaque base (FTS5, pg_trgm), hors du schéma des modèles
+    if sender.name == 'core':
+        install_student_search(connections[using])
@@ -0,0 +1,83 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import IntegerField, Subquery, Value
+
+from .models import AttendanceSession, Project, Student, Subject, WorkGroup
+from .projects import visible_projects_q
+
+
+DASHBOARD_STATS_TIMEOUT = 300
+DASHBOARD_GENERATION_KEY = 'core:dashboard-generation'
+
+
+class SubqueryCount(Subquery):
+    """COUNT(*) d'un queryset, utilisable comme sous-requête scalaire."""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+
+
+def _count(queryset):
+    return SubqueryCount(queryset.order_by().values('pk'))
+
+
+def _role_counts(role, user, student_pk):
+    if role == 'delegate':
+        return {
+            'students_count': _count(Student.objects.all()),
+            'subjects_count': _count(Subject.objects.all()),
+            'groups_count': _count(WorkGroup.objects.filter(created_by=user)),
+        }
+    if role == 'director':
+        return {
+            'total_sessions': _count(AttendanceSession.objects.all()),
+            'pending_comments': _count(AttendanceSession.objects.filter(comment_count=0)),
+        }
+    if role == 'student':
+        return {
+            # students=None compterait les groupes vides
+            'groups_count': (
+                _count(WorkGroup.objects.filter(students=student_pk)) if student_pk
+                else Value(0, output_field=IntegerField())
+            ),
+            'projects_count': _count(Project.objects.filter(visible_projects_q(student_pk))),
+        }
+    return {}
+
+
+def compute_dashboard_stats(role, user, student_pk=None):
+    """Calcule tous les compteurs du tableau de bord d'un rôle en une seule requête."""
+    counts = _role_counts(role, user, student_pk)
+    if not counts:
+        return {}
+    stats = User.objects.filter(pk=user.pk).values(**counts).first() or {}
+    if role == 'director':
+        stats['commented_sessions'] = stats['total_sessions'] - stats['pending_comments']
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """Rend obsolètes toutes les statistiques en cache (appelé par les signaux)."""
+    cache.set(DASHBOARD_GENERATION_KEY, time.time_ns(), None)
+
+
+def _dashboard_generation():
+    # Clé évincée du cache : nouvelle génération, jamais une valeur par défaut
+    # qui ferait revenir les statistiques d'une génération déjà invalidée
+    generation = cache.get(DASHBOARD_GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(DASHBOARD_GENERATION_KEY, generation, None):
+            generation = cache.get(DASHBOARD_GENERATION_KEY, generation)
+    return generation
+
+
+def dashboard_stats(role, user, student_pk=None):
+    generation = _dashboard_generation()
+    key = f'core:dashboard:{generation}:{role}:{user.pk}:{student_pk}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(role, user, student_pk)
+        cache.set(key, stats, DASHBOARD_STATS_TIMEOUT)
+    return stats
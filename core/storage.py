@@ -0,0 +1,70 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+INCOMING_DIR = '.incoming'
+
+
+def _extension(name):
+    ext = os.path.splitext(name)[1].lower()
+    return ext if re.fullmatch(r'\.[a-z0-9]{1,10}', ext) else ''
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage par empreinte : un fichier est enregistré sous
+    `<dossier>/<sha[:2]>/<sha256><extension>`.
+
+    Deux envois au contenu identique partagent donc le même fichier sur disque.
+    Les fichiers ne sont jamais supprimés ici : le nombre de références est tenu
+    par StoredFile et la commande gc_submission_files supprime les orphelins.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Le nom définitif dépend du contenu et est calculé dans _save
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        incoming = self.path(posixpath.join(directory, INCOMING_DIR))
+        os.makedirs(incoming, exist_ok=True)
+
+        # Copie et empreinte en un seul passage
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    output.write(chunk)
+
+            sha = digest.hexdigest()
+            final_name = posixpath.join(directory, sha[:2], sha + _extension(name))
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                # Déjà stocké : rafraîchir la date pour le ramasse-miettes
+                os.unlink(tmp_path)
+                os.utime(final_path)
+                return final_name
+
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, final_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return final_name
+
+
+submission_storage = ContentAddressedStorage()
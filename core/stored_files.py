@@ -0,0 +1,125 @@
+import os
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .intake import spooled_submission_files
+from .models import ProjectSubmission, StoredFile
+from .storage import INCOMING_DIR
+
+
+# Un fichier plus récent que ce délai peut appartenir à un envoi en cours
+GC_GRACE_PERIOD = timedelta(hours=1)
+
+
+def retain_file(name):
+    """Ajoute une référence au fichier `name`."""
+    if not name:
+        return
+    storage = ProjectSubmission._meta.get_field('file').storage
+    with transaction.atomic():
+        stored, created = StoredFile.objects.get_or_create(
+            name=name,
+            defaults={'size': storage.size(name) if storage.exists(name) else 0, 'ref_count': 1},
+        )
+        if not created:
+            StoredFile.objects.filter(pk=stored.pk).update(
+                ref_count=F('ref_count') + 1, updated_at=timezone.now()
+            )
+
+
+def release_file(name):
+    """Retire une référence ; le fichier est supprimé plus tard par le ramasse-miettes."""
+    if not name:
+        return
+    StoredFile.objects.filter(name=name).update(
+        ref_count=F('ref_count') - 1, updated_at=timezone.now()
+    )
+
+
+@dataclass
+class CollectResult:
+    deleted: list = field(default_factory=list)
+    reclaimed: int = 0
+    # Compteurs corrigés : fichier encore référencé par une soumission
+    repaired: int = 0
+
+
+def _is_old(path, cutoff):
+    try:
+        return os.path.getmtime(path) < cutoff.timestamp()
+    except FileNotFoundError:
+        return False
+
+
+def collect_garbage(grace=GC_GRACE_PERIOD, dry_run=False):
+    """
+    Supprime les fichiers de soumission qui ne sont plus référencés.
+
+    Les StoredFile à zéro référence sont vérifiés contre les soumissions avant
+    suppression. Le dossier est aussi parcouru pour les fichiers sans StoredFile
+    (anciennes copies, envois interrompus). Rien de plus récent que `grace`
+    n'est supprimé.
+    """
+    field_ = ProjectSubmission._meta.get_field('file')
+    storage = field_.storage
+    cutoff = timezone.now() - grace
+    result = CollectResult()
+
+    live = set(
+        ProjectSubmission.objects.exclude(file='').values_list('file', flat=True).distinct().iterator()
+    )
+    live |= spooled_submission_files()
+
+    def remove(name, path):
+        size = os.path.getsize(path)
+        if not dry_run:
+            os.unlink(path)
+        result.deleted.append(name)
+        result.reclaimed += size
+
+    tracked = set()
+    for stored in StoredFile.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).iterator():
+        if stored.name in live:
+            if not dry_run:
+                StoredFile.objects.filter(pk=stored.pk).update(
+                    ref_count=ProjectSubmission.objects.filter(file=stored.name).count()
+                )
+            result.repaired += 1
+            continue
+        path = storage.path(stored.name)
+        if not dry_run:
+            # La date de modification est rafraîchie quand un envoi réutilise le fichier
+            deleted, _ = StoredFile.objects.filter(
+                pk=stored.pk, ref_count__lte=0, updated_at__lt=cutoff
+            ).delete()
+            if not deleted:
+                continue
+        tracked.add(stored.name)
+        if os.path.exists(path) and _is_old(path, cutoff):
+            remove(stored.name, path)
+
+    # Fichiers présents sur disque mais inconnus des deux tables
+    root = storage.path(field_.upload_to)
+    known = set(StoredFile.objects.filter(ref_count__gt=0).values_list('name', flat=True).iterator())
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            if name in live or name in known or name in tracked:
+                continue
+            if _is_old(path, cutoff):
+                remove(name, path)
+
+    # Dossiers vidés (hors dossier de réception)
+    if not dry_run:
+        for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+            if dirpath != root and not dirnames and not filenames and os.path.basename(dirpath) != INCOMING_DIR:
+                try:
+                    os.rmdir(dirpath)
+                except OSError:
+                    pass
+    return result
@@ -0,0 +1,137 @@
+"""
+Recherche d'étudiants (nom, prénom, numéro, email) et comptes par filière.
+
+- SQLite : table FTS5 `core_student_fts` tenue à jour par des déclencheurs ;
+- PostgreSQL : index trigrammes (pg_trgm) sur chaque champ, utilisés par icontains ;
+- autre base, ou extension indisponible : icontains sans index.
+"""
+import logging
+import re
+
+from django.db import DatabaseError, connection
+from django.db.models import Count, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Student
+
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ['last_name', 'first_name', 'student_id', 'email']
+
+FTS_TABLE = 'core_student_fts'
+
+_SQLITE_FTS_TABLE_SQL = f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    last_name, first_name, student_id, email,
+    content='core_student', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)"""
+
+# Une reconstruction de core_student par SQLite (AlterField, AddField...) les supprime
+_SQLITE_FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON core_student BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, last_name, first_name, student_id, email)
+        VALUES (new.id, new.last_name, new.first_name, new.student_id, new.email);
+    END""",
+    f'{FTS_TABLE}_ad': f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON core_student BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, last_name, first_name, student_id, email)
+        VALUES ('delete', old.id, old.last_name, old.first_name, old.student_id, old.email);
+    END""",
+    f'{FTS_TABLE}_au': f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON core_student BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, last_name, first_name, student_id, email)
+        VALUES ('delete', old.id, old.last_name, old.first_name, old.student_id, old.email);
+        INSERT INTO {FTS_TABLE}(rowid, last_name, first_name, student_id, email)
+        VALUES (new.id, new.last_name, new.first_name, new.student_id, new.email);
+    END""",
+}
+
+_SQLITE_FTS_SQL = [
+    _SQLITE_FTS_TABLE_SQL,
+    *_SQLITE_FTS_TRIGGERS.values(),
+    # Indexation des étudiants présents (ou modifiés pendant l'absence des déclencheurs)
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+_POSTGRES_TRGM_SQL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS core_student_{name}_trgm ON core_student USING gin (UPPER({name}) gin_trgm_ops)"
+    for name in SEARCH_FIELDS
+]
+
+# Bases (par nom) où la table FTS5 existe
+_fts_databases = {}
+
+
+def _sqlite_has_fts(conn):
+    key = str(conn.settings_dict['NAME'])
+    if key not in _fts_databases:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_databases[key] = cursor.fetchone() is not None
+    return _fts_databases[key]
+
+
+def _sqlite_fts_complete(conn):
+    """Table FTS5 et ses trois déclencheurs présents."""
+    names = [FTS_TABLE, *_SQLITE_FTS_TRIGGERS]
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", names
+        )
+        return cursor.fetchone()[0] == len(names)
+
+
+def install_student_search(conn=connection):
+    """
+    Crée la table FTS5 et ses déclencheurs (SQLite) ou les index trigrammes
+    (PostgreSQL) s'ils manquent. Créés par la migration 0013, ils sont vérifiés
+    après chaque migrate : une migration de Student peut supprimer les déclencheurs.
+    """
+    if conn.vendor == 'sqlite':
+        _fts_databases.pop(str(conn.settings_dict['NAME']), None)
+        if _sqlite_fts_complete(conn):
+            return
+        statements = _SQLITE_FTS_SQL
+    elif conn.vendor == 'postgresql':
+        statements = _POSTGRES_TRGM_SQL
+    else:
+        return
+
+    try:
+        with conn.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    except DatabaseError as e:
+        # FTS5 non compilé, ou droits insuffisants pour CREATE EXTENSION
+        logger.warning("Recherche d'étudiants sans index plein texte : %s", e)
+    _fts_databases.pop(str(conn.settings_dict['NAME']), None)
+
+
+def _fts_query(terms):
+    # Chaque terme est un préfixe ; les guillemets neutralisent la syntaxe FTS5
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+def search_students(queryset, query):
+    """Filtre `queryset` : chaque mot de `query` doit apparaître dans l'un des champs recherchés."""
+    terms = [term for term in re.split(r'\s+', query.strip()) if term]
+    if not terms:
+        return queryset
+
+    if connection.vendor == 'sqlite' and _sqlite_has_fts(connection):
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [_fts_query(terms)]
+        ))
+
+    condition = Q()
+    for term in terms:
+        term_q = Q()
+        for name in SEARCH_FIELDS:
+            term_q |= Q(**{f'{name}__icontains': term})
+        condition &= term_q
+    return queryset.filter(condition)
+
+
+def filiere_facets(queryset):
+    """[(clé, libellé, nombre)] pour toutes les filières, en un seul GROUP BY."""
+    counts = dict(queryset.order_by().values_list('filiere').annotate(n=Count('id')))
+    return [(key, label, counts.get(key, 0)) for key, label in Student.FILIERE_CHOICES]
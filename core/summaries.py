@@ -0,0 +1,109 @@
+"""
+Bilan de présence par (étudiant, matière), tenu à jour à chaque écriture.
+
+Les chemins groupés de attendance.py décalent les compteurs par UPDATE
+ensemblistes ; les écritures unitaires (admin) passent par les signaux.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Attendance, AttendanceSummary
+
+
+SUMMARY_BATCH_SIZE = 1000
+
+
+def ensure_summaries(subject_id, student_ids, batch_size=SUMMARY_BATCH_SIZE):
+    """Crée les lignes de bilan manquantes (à zéro)."""
+    AttendanceSummary.objects.bulk_create(
+        [AttendanceSummary(subject_id=subject_id, student_id=student_id) for student_id in student_ids],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+def shift_summaries(subject_id, student_ids, present=0, absent=0):
+    """Ajoute `present` / `absent` aux bilans des étudiants donnés (liste ou sous-requête)."""
+    return AttendanceSummary.objects.filter(subject_id=subject_id, student_id__in=student_ids).update(
+        present=F('present') + present, absent=F('absent') + absent
+    )
+
+
+def record_attendance(subject_id, student_id, is_present, sign=1):
+    """Compte (sign=1) ou décompte (sign=-1) une présence isolée."""
+    if sign > 0:
+        ensure_summaries(subject_id, [student_id])
+    shift_summaries(
+        subject_id, [student_id],
+        present=sign if is_present else 0,
+        absent=0 if is_present else sign,
+    )
+
+
+def move_session_summaries(session_id, old_subject_id, new_subject_id):
+    """Reporte les présences d'une session sur sa nouvelle matière (matière modifiée)."""
+    attendances = Attendance.objects.filter(session_id=session_id)
+    with transaction.atomic():
+        ensure_summaries(new_subject_id, list(attendances.values_list('student_id', flat=True)))
+        for is_present, field in ((True, 'present'), (False, 'absent')):
+            student_ids = attendances.filter(is_present=is_present).values('student_id')
+            shift_summaries(old_subject_id, student_ids, **{field: -1})
+            shift_summaries(new_subject_id, student_ids, **{field: 1})
+
+
+def computed_summaries():
+    """Bilans recalculés depuis Attendance : {(étudiant, matière): (présents, absents)}."""
+    rows = Attendance.objects.order_by().values('student_id', 'session__subject_id').annotate(
+        n_present=Count('id', filter=Q(is_present=True)),
+        n_absent=Count('id', filter=Q(is_present=False)),
+    )
+    return {
+        (row['student_id'], row['session__subject_id']): (row['n_present'], row['n_absent'])
+        for row in rows.iterator()
+    }
+
+
+def summary_drift():
+    """Différences entre la table de bilan et un recalcul complet."""
+    expected = computed_summaries()
+    stored = {
+        (student_id, subject_id): (present, absent)
+        for student_id, subject_id, present, absent in AttendanceSummary.objects.values_list(
+            'student_id', 'subject_id', 'present', 'absent'
+        ).iterator()
+    }
+    drift = []
+    for key in expected.keys() | stored.keys():
+        if expected.get(key, (0, 0)) != stored.get(key, (0, 0)):
+            drift.append((key, stored.get(key), expected.get(key)))
+    return drift
+
+
+def _lock_attendance():
+    # PostgreSQL : bloque les écritures de présences jusqu'à la fin de la transaction,
+    # lectures permises. SQLite : la transaction (IMMEDIATE) tient déjà le verrou d'écriture.
+    connection = transaction.get_connection()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {connection.ops.quote_name(Attendance._meta.db_table)} IN SHARE MODE')
+
+
+def rebuild_summaries(batch_size=SUMMARY_BATCH_SIZE):
+    """
+    Reconstruit toute la table en une transaction ; retourne le nombre de lignes.
+
+    Le recalcul est fait dans la transaction, présences verrouillées : aucune
+    présence écrite pendant la reconstruction n'est perdue.
+    """
+    with transaction.atomic():
+        _lock_attendance()
+        expected = computed_summaries()
+        AttendanceSummary.objects.all().delete()
+        AttendanceSummary.objects.bulk_create(
+            [
+                AttendanceSummary(student_id=student_id, subject_id=subject_id, present=present, absent=absent)
+                for (student_id, subject_id), (present, absent) in expected.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(expected)
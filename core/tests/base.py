@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.attendance import create_session_roster
+from core.models import AttendanceSession, Project, Student, Subject, UserProfile
+
+
+class CoreTestCase(TestCase):
+    """Fichiers (média, cache PDF, téléversements, file d'envois) et cache isolés par test."""
+
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.media_root = root
+        overrides = override_settings(
+            MEDIA_ROOT=root,
+            ATTENDANCE_PDF_CACHE_DIR=root / 'cache' / 'attendance_pdf',
+            CHUNKED_UPLOAD_DIR=root / 'uploads' / 'partial',
+            SUBMISSION_SPOOL_DIR=root / 'spool' / 'submissions',
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        # Les identifiants sont réutilisés d'un test à l'autre : pas de rôle en cache
+        cache.clear()
+
+    def make_user(self, username, user_type):
+        user = User.objects.create_user(username, password='secret')
+        UserProfile.objects.create(user=user, user_type=user_type)
+        return user
+
+    def make_subject(self, code='INF101', teacher_email='prof@example.com'):
+        return Subject.objects.create(
+            name='Algorithmique', code=code, teacher='M. Prof', teacher_email=teacher_email
+        )
+
+    def make_student(self, number, email='', user=None):
+        return Student.objects.create(
+            first_name='Awa', last_name=f'Diallo {number}', filiere='informatique',
+            student_id=f'E{number:04d}', email=email, user=user,
+        )
+
+    def make_session(self, subject, user, students=(), day=None):
+        session = AttendanceSession.objects.create(
+            subject=subject, date=day or date(2024, 3, 4), start_time=time(8), end_time=time(10),
+            created_by=user,
+        )
+        create_session_roster(session, [student.id for student in students])
+        return session
+
+    def make_project(self, subject, user):
+        return Project.objects.create(
+            title='Compilateur', description='Projet de compilation', subject=subject,
+            project_type='individual', due_date=timezone.now() + timedelta(days=7), created_by=user,
+        )
@@ -0,0 +1,129 @@
+import zipfile
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.utils import timezone
+
+from core.jobs import JOB_LEASE, JOB_MAX_ATTEMPTS, claim_next_job, enqueue_job, recover_stale_jobs, run_job
+from core.models import Job, Student
+from core.pdf import cached_attendance_pdf
+
+from .base import CoreTestCase
+
+
+ROSTER_CSV = (
+    "Nom(s);Prénom(s);Filière;Numéro étudiant;Email\n"
+    "Diallo;Awa;informatique;E0001;awa@example.com\n"
+    "Traoré;Moussa;physique;E0002;\n"
+)
+
+
+class JobQueueTests(CoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.director = self.make_user('directeur', 'director')
+
+    def test_claim_takes_oldest_pending_job_once(self):
+        first = enqueue_job('attendance_pdf', self.director, {'session_id': 1})
+        enqueue_job('attendance_pdf', self.director, {'session_id': 2})
+
+        self.assertEqual(claim_next_job(), first.id)
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'running')
+        self.assertEqual(first.attempts, 1)
+        self.assertNotEqual(claim_next_job(), first.id)
+        self.assertIsNone(claim_next_job())
+
+    def test_stale_running_job_is_requeued_then_failed(self):
+        job = enqueue_job('attendance_pdf', self.director, {'session_id': 1})
+        old = timezone.now() - JOB_LEASE - timedelta(seconds=1)
+        Job.objects.filter(id=job.id).update(status='running', heartbeat_at=old, attempts=1)
+
+        self.assertEqual(recover_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+
+        Job.objects.filter(id=job.id).update(status='running', heartbeat_at=old, attempts=JOB_MAX_ATTEMPTS)
+        recover_stale_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+    def test_unknown_session_fails_the_job(self):
+        job = enqueue_job('attendance_pdf', self.director, {'session_id': 999})
+        self.assertEqual(run_job(claim_next_job()), 'failed')
+        job.refresh_from_db()
+        self.assertIn('DoesNotExist', job.error)
+        self.assertIsNotNone(job.finished_at)
+
+
+class ImportStudentsJobTests(CoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.director = self.make_user('directeur', 'director')
+
+    def test_import_creates_students_and_removes_input(self):
+        job = enqueue_job(
+            'import_students', self.director, input_file=ContentFile(ROSTER_CSV.encode(), name='liste.csv')
+        )
+        input_path = job.input_file.path
+
+        self.assertEqual(run_job(claim_next_job()), 'done')
+        job.refresh_from_db()
+        self.assertEqual(job.result['created'], 2)
+        self.assertEqual(job.result['errors'], [])
+        self.assertEqual(Student.objects.get(student_id='E0001').email, 'awa@example.com')
+        self.assertFalse(job.input_file)
+        self.assertFalse(self.media_root.joinpath(input_path).exists())
+
+    def test_bad_header_fails_and_removes_input(self):
+        job = enqueue_job(
+            'import_students', self.director, input_file=ContentFile(b"Nom;Age\nDiallo;20\n", name='liste.csv')
+        )
+        input_path = job.input_file.path
+
+        self.assertEqual(run_job(claim_next_job()), 'failed')
+        job.refresh_from_db()
+        self.assertIn('Prénom(s)', job.error)
+        self.assertFalse(self.media_root.joinpath(input_path).exists())
+        self.assertFalse(Student.objects.exists())
+
+
+@override_settings(ATTENDANCE_EXPORT_WORKERS=1)
+class AttendanceExportJobTests(CoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.director = self.make_user('directeur', 'director')
+        self.delegate = self.make_user('delegue', 'delegate')
+        subject = self.make_subject()
+        students = [self.make_student(n) for n in range(3)]
+        self.sessions = [
+            self.make_session(subject, self.delegate, students, day=timezone.localdate() - timedelta(days=n))
+            for n in range(2)
+        ]
+
+    def run_export(self, payload):
+        job = enqueue_job('attendance_export', self.director, payload)
+        self.assertEqual(run_job(claim_next_job()), 'done')
+        job.refresh_from_db()
+        return job
+
+    def test_zip_export_renders_and_caches_each_session(self):
+        job = self.run_export({})
+
+        self.assertEqual((job.progress, job.total), (2, 2))
+        self.assertEqual(job.result, {'sessions': 2})
+        for session in self.sessions:
+            session.refresh_from_db()
+            self.assertIsNotNone(cached_attendance_pdf(session))
+        with job.output_file.open('rb') as output, zipfile.ZipFile(output) as archive:
+            names = archive.namelist()
+            self.assertEqual(len(names), 2)
+            self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in names))
+
+    def test_pdf_export_merges_cached_sessions(self):
+        job = self.run_export({'format': 'pdf', 'subject': str(self.sessions[0].subject_id)})
+
+        self.assertTrue(job.output_file.name.endswith('.pdf'))
+        with job.output_file.open('rb') as output:
+            self.assertEqual(output.read(4), b'%PDF')
@@ -0,0 +1,13 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class MigrationTests(TestCase):
+    def test_models_have_no_missing_migrations(self):
+        output = StringIO()
+        try:
+            call_command('makemigrations', 'core', check=True, dry_run=True, stdout=output)
+        except SystemExit:
+            self.fail(f"Migration manquante pour core :\n{output.getvalue()}")
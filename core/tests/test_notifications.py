@@ -0,0 +1,104 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import override_settings
+from django.utils import timezone
+
+from core.models import Attendance, Notification
+from core.notifications import ABSENCE_ALERT_DELAY, dispatch_notifications, queue_absence_alerts
+
+from .base import CoreTestCase
+
+
+class AbsenceAlertTests(CoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.delegate = self.make_user('delegue', 'delegate')
+        self.students = [self.make_student(n, email=f'etudiant{n}@example.com') for n in range(3)]
+        self.session = self.make_session(self.make_subject(), self.delegate, self.students)
+
+    def toggle(self, changes):
+        self.client.force_login(self.delegate)
+        return self.client.post(
+            f'/attendance/{self.session.id}/toggle/', json.dumps({'changes': changes}),
+            content_type='application/json',
+        )
+
+    def attendance(self, student):
+        return Attendance.objects.get(session=self.session, student=student)
+
+    def test_first_toggle_alerts_every_absent_student_and_the_teacher(self):
+        response = self.toggle([{'id': self.attendance(self.students[0]).id, 'present': True}])
+        self.assertEqual(response.status_code, 200)
+
+        alerts = Notification.objects.filter(session=self.session)
+        self.assertEqual(
+            set(alerts.filter(kind='absence_student').values_list('recipient', flat=True)),
+            {'etudiant1@example.com', 'etudiant2@example.com'},
+        )
+        self.assertEqual(alerts.filter(kind='absence_teacher', recipient='prof@example.com').count(), 2)
+
+    def test_student_marked_present_loses_pending_alert(self):
+        queue_absence_alerts(self.session)
+        self.toggle([{'id': self.attendance(self.students[1]).id, 'present': True}])
+
+        self.assertFalse(Notification.objects.filter(student=self.students[1]).exists())
+        self.assertTrue(Notification.objects.filter(student=self.students[2]).exists())
+
+    def test_non_boolean_present_is_rejected(self):
+        response = self.toggle([{'id': self.attendance(self.students[0]).id, 'present': 'false'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.attendance(self.students[0]).is_present)
+
+    @override_settings(ABSENCE_ALERTS_ENABLED=False)
+    def test_alerts_can_be_disabled(self):
+        queue_absence_alerts(self.session)
+        self.assertFalse(Notification.objects.exists())
+
+
+class DispatchTests(CoreTestCase):
+    def setUp(self):
+        super().setUp()
+        delegate = self.make_user('delegue', 'delegate')
+        students = [self.make_student(n, email=f'etudiant{n}@example.com') for n in range(2)]
+        self.session = self.make_session(self.make_subject(), delegate, students)
+        queue_absence_alerts(self.session)
+        # Délai de grâce écoulé
+        Notification.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_alerts_are_not_sent_before_the_delay(self):
+        Notification.objects.update(next_attempt_at=timezone.now() + ABSENCE_ALERT_DELAY)
+        self.assertEqual(dispatch_notifications().sent, 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_one_digest_per_recipient(self):
+        result = dispatch_notifications()
+
+        self.assertEqual((result.digests, result.sent), (3, 4))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [
+            'etudiant0@example.com', 'etudiant1@example.com', 'prof@example.com',
+        ])
+        teacher_digest = next(message for message in mail.outbox if message.to == ['prof@example.com'])
+        self.assertIn('E0000', teacher_digest.body)
+        self.assertIn('E0001', teacher_digest.body)
+        self.assertFalse(Notification.objects.exclude(status='sent').exists())
+
+    def test_failed_recipient_is_retried_later(self):
+        connection = mail.get_connection()
+        send = connection.send_messages
+
+        def send_messages(messages):
+            if messages[0].to == ['prof@example.com']:
+                raise OSError('refusé')
+            return send(messages)
+
+        with mock.patch.object(connection, 'send_messages', side_effect=send_messages):
+            result = dispatch_notifications(connection=connection)
+
+        self.assertEqual((result.sent, result.retried), (2, 2))
+        for notification in Notification.objects.filter(recipient='prof@example.com'):
+            self.assertEqual((notification.status, notification.attempts), ('pending', 1))
+            self.assertEqual(notification.last_error, 'refusé')
+            self.assertGreater(notification.next_attempt_at, timezone.now())
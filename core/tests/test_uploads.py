@@ -0,0 +1,93 @@
+import hashlib
+import json
+from unittest import mock
+
+from core.intake import drain_submissions
+from core.models import ProjectSubmission, UploadSession
+from core.uploads import partial_path
+
+from .base import CoreTestCase
+
+
+CONTENT = b'0123456789' * 100
+
+
+class ChunkedUploadTests(CoreTestCase):
+    def setUp(self):
+        super().setUp()
+        teacher = self.make_user('delegue', 'delegate')
+        user = self.make_user('etudiant', 'student')
+        self.student = self.make_student(1, user=user)
+        self.project = self.make_project(self.make_subject(), teacher)
+        self.client.force_login(user)
+
+    def start(self, content=CONTENT, sha256=None):
+        response = self.client.post(
+            f'/student/projects/{self.project.id}/uploads/',
+            json.dumps({
+                'filename': 'rapport.pdf', 'size': len(content),
+                'sha256': hashlib.sha256(content).hexdigest() if sha256 is None else sha256,
+            }),
+            content_type='application/json',
+        )
+        return response
+
+    def send(self, upload_id, offset, data):
+        return self.client.put(
+            f'/student/uploads/{upload_id}/chunk/?offset={offset}', data,
+            content_type='application/octet-stream',
+        )
+
+    def test_chunks_are_assembled_and_queued_for_submission(self):
+        upload_id = self.start().json()['upload_id']
+        self.assertEqual(self.send(upload_id, 0, CONTENT[:600]).json()['offset'], 600)
+        status = self.send(upload_id, 600, CONTENT[600:]).json()
+
+        self.assertTrue(status['completed'])
+        self.assertEqual(status['sha256'], hashlib.sha256(CONTENT).hexdigest())
+        self.assertFalse(partial_path(UploadSession.objects.get(id=upload_id)).exists())
+
+        self.assertEqual(drain_submissions().saved, 1)
+        submission = ProjectSubmission.objects.get(project=self.project, student=self.student)
+        with submission.file.open('rb') as stored:
+            self.assertEqual(stored.read(), CONTENT)
+
+    def test_out_of_order_chunk_returns_current_offset(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, CONTENT[:100])
+
+        response = self.send(upload_id, 300, CONTENT[300:400])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 100)
+
+    def test_restart_resumes_the_same_upload(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, CONTENT[:100])
+
+        status = self.start().json()
+        self.assertEqual((status['upload_id'], status['offset']), (upload_id, 100))
+
+    def test_hash_mismatch_restarts_from_an_empty_file(self):
+        upload_id = self.start(sha256='0' * 64).json()['upload_id']
+
+        response = self.send(upload_id, 0, CONTENT)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['offset'], 0)
+        upload = UploadSession.objects.get(id=upload_id)
+        self.assertEqual(upload.received, 0)
+        self.assertEqual(partial_path(upload).stat().st_size, 0)
+
+        # Le même téléversement reste utilisable
+        self.assertEqual(self.send(upload_id, 0, CONTENT[:100]).json()['offset'], 100)
+
+    def test_failed_enqueue_is_retried_on_restart(self):
+        upload_id = self.start().json()['upload_id']
+        with mock.patch('core.uploads.enqueue_submission', side_effect=OSError('disque plein')):
+            response = self.send(upload_id, 0, CONTENT)
+        self.assertEqual(response.status_code, 503)
+        self.assertTrue(partial_path(UploadSession.objects.get(id=upload_id)).exists())
+
+        status = self.start().json()
+        self.assertEqual(status['upload_id'], upload_id)
+        self.assertTrue(status['completed'])
+        self.assertEqual(drain_submissions().saved, 1)
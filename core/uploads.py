@@ -0,0 +1,184 @@
+import hashlib
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .intake import enqueue_submission
+from .models import ProjectSubmission, UploadSession
+
+
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+UPLOAD_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+UPLOAD_READ_BLOCK = 64 * 1024
+# Au-delà, un morceau en cours est considéré comme abandonné (processus interrompu)
+UPLOAD_WRITE_LEASE = timedelta(minutes=5)
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def _partial_dir():
+    return Path(settings.CHUNKED_UPLOAD_DIR)
+
+
+def partial_path(upload):
+    return _partial_dir() / f"{upload.id}.part"
+
+
+def start_upload(project, student, filename, size, sha256='', notes=''):
+    """Crée un téléversement, ou reprend celui en cours pour le même fichier."""
+    filename = os.path.basename(filename)
+    upload = UploadSession.objects.filter(
+        project=project, student=student, filename=filename, size=size, completed_at__isnull=True,
+    ).order_by('-created_at').first()
+    if upload:
+        # Resynchroniser le décalage avec ce qui est réellement sur disque
+        path = partial_path(upload)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch(exist_ok=True)
+        on_disk = path.stat().st_size
+        if on_disk != upload.received:
+            upload.received = min(on_disk, upload.received)
+            upload.save(update_fields=['received'])
+        if upload.received == upload.size:
+            # Fichier complet mais mise en file échouée : nouvel essai
+            _finish_or_retry_later(upload)
+        return upload
+
+    upload = UploadSession.objects.create(
+        project=project, student=student, filename=filename, size=size,
+        expected_sha256=(sha256 or '').lower(), notes=notes,
+    )
+    partial_path(upload).parent.mkdir(parents=True, exist_ok=True)
+    partial_path(upload).touch()
+    return upload
+
+
+def _reserve_chunk(upload, offset):
+    """Réserve l'écriture à `offset` (UPDATE conditionnel) ; retourne le jeton ou None."""
+    now = timezone.now()
+    reserved = UploadSession.objects.filter(
+        Q(writing_since__isnull=True) | Q(writing_since__lt=now - UPLOAD_WRITE_LEASE),
+        id=upload.id, received=offset, completed_at__isnull=True,
+    ).update(writing_since=now)
+    return now if reserved else None
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Écrit `length` octets lus dans `stream` à la position `offset` du fichier partiel.
+
+    Les morceaux doivent arriver dans l'ordre : un décalage différent de celui
+    attendu, ou un morceau déjà en cours d'écriture, renvoie une erreur 409
+    avec le décalage courant, pour reprise.
+    """
+    if upload.is_complete:
+        raise UploadError("Téléversement déjà terminé.", status=409, offset=upload.received)
+    if offset != upload.received:
+        raise UploadError("Décalage inattendu.", status=409, offset=upload.received)
+    if length <= 0 or length > UPLOAD_MAX_CHUNK_SIZE or offset + length > upload.size:
+        raise UploadError("Taille de morceau invalide.", offset=upload.received)
+
+    # La plage est réservée avant d'écrire : un second envoi du même morceau
+    # attend que le premier ait abouti ou échoué
+    token = _reserve_chunk(upload, offset)
+    if token is None:
+        upload.refresh_from_db(fields=['received'])
+        raise UploadError("Morceau concurrent.", status=409, offset=upload.received)
+
+    path = partial_path(upload)
+    written = 0
+    try:
+        with open(path, 'r+b') as part:
+            # Au-delà de `offset` : restes non validés d'un envoi interrompu
+            part.seek(offset)
+            part.truncate()
+            while written < length:
+                block = stream.read(min(UPLOAD_READ_BLOCK, length - written))
+                if not block:
+                    break
+                part.write(block)
+                written += len(block)
+            if written != length:
+                # Connexion interrompue : on revient au dernier décalage validé, le client reprendra
+                part.truncate(offset)
+    except BaseException:
+        UploadSession.objects.filter(id=upload.id, writing_since=token).update(writing_since=None)
+        raise
+    if written != length:
+        UploadSession.objects.filter(id=upload.id, writing_since=token).update(writing_since=None)
+        raise UploadError("Morceau incomplet.", offset=offset)
+
+    advanced = UploadSession.objects.filter(id=upload.id, received=offset, writing_since=token).update(
+        received=offset + length, writing_since=None
+    )
+    if not advanced:
+        # Réservation expirée et reprise par un autre envoi : son écriture prévaut
+        upload.refresh_from_db(fields=['received'])
+        raise UploadError("Morceau concurrent.", status=409, offset=upload.received)
+    upload.received = offset + length
+
+    if upload.received == upload.size:
+        _finish_or_retry_later(upload)
+    return upload
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(UPLOAD_READ_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _finish_or_retry_later(upload):
+    try:
+        finish_upload(upload)
+    except UploadError:
+        raise
+    except Exception:
+        # Le fichier complet reste en place : reprendre le téléversement
+        # (start_upload) relance la mise en file
+        raise UploadError(
+            "Réception impossible pour le moment, veuillez réessayer.", status=503, offset=upload.received
+        )
+
+
+def finish_upload(upload):
+    """
+    Vérifie l'empreinte puis met le fichier assemblé en file de soumission.
+
+    Comme un envoi direct, la soumission passe par enqueue_submission : elle
+    est horodatée maintenant et écrite par drain_submissions, dans l'ordre.
+    """
+    path = partial_path(upload)
+    upload.sha256 = _file_sha256(path)
+    if upload.expected_sha256 and upload.expected_sha256 != upload.sha256:
+        # Tout recommencer dans le même téléversement, depuis un fichier vide
+        with open(path, 'wb'):
+            pass
+        UploadSession.objects.filter(id=upload.id).update(received=0, sha256='')
+        upload.received = 0
+        upload.sha256 = ''
+        raise UploadError("Empreinte SHA-256 différente : fichier corrompu, veuillez recommencer.", offset=0)
+
+    notes = upload.notes or ProjectSubmission.objects.filter(
+        project=upload.project, student=upload.student
+    ).values_list('notes', flat=True).first() or ''
+    with open(path, 'rb') as assembled:
+        received_at = enqueue_submission(
+            upload.project, upload.student, File(assembled, name=upload.filename), notes
+        )
+    upload.completed_at = received_at
+    upload.save(update_fields=['sha256', 'completed_at', 'received'])
+    path.unlink(missing_ok=True)
+    return received_at
@@ -25,14 +25,30 @@ urlpatterns = [
     path('attendance/', views.attendance_sessions, name='attendance_sessions'),
     path('attendance/create/', views.create_attendance_session, name='create_attendance_session'),
     path('attendance/<int:session_id>/', views.take_attendance, name='take_attendance'),
+    path('attendance/<int:session_id>/roster/', views.attendance_roster_api, name='attendance_roster_api'),
+    path('attendance/<int:session_id>/toggle/', views.attendance_toggle_api, name='attendance_toggle_api'),
     path('attendance/<int:session_id>/pdf/', views.generate_attendance_pdf, name='generate_attendance_pdf'),
     
+    # Background jobs
+    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/status/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/download/', views.job_download, name='job_download'),
+    
     # Director views
     path('director/attendance/', views.director_attendance_list, name='director_attendance_list'),
+    path('director/attendance/export/', views.director_attendance_export, name='director_attendance_export'),
+    path('director/attendance/report/', views.director_attendance_report, name='director_attendance_report'),
+    path('director/attendance/matrix/', views.director_attendance_matrix, name='director_attendance_matrix'),
     path('director/attendance/<int:session_id>/comment/', views.director_add_comment, name='director_add_comment'),
+    path('director/projects/', views.director_projects, name='director_projects'),
+    path('director/projects/<int:project_id>/submissions/', views.director_project_submissions, name='director_project_submissions'),
+    path('director/projects/<int:project_id>/submissions/zip/', views.director_project_submissions_zip, name='director_project_submissions_zip'),
     
     # Student views
     path('student/groups/', views.student_groups, name='student_groups'),
     path('student/projects/', views.student_projects, name='student_projects'),
     path('student/projects/<int:project_id>/submit/', views.submit_project, name='submit_project'),
+    path('student/projects/<int:project_id>/uploads/', views.upload_start, name='upload_start'),
+    path('student/uploads/<uuid:upload_id>/', views.upload_status, name='upload_status'),
+    path('student/uploads/<uuid:upload_id>/chunk/', views.upload_chunk, name='upload_chunk'),
 ]
\ No newline at end of file
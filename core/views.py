@@ -2,22 +2,37 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
-from django.core.mail import send_mail
-from django.conf import settings
-from django.db.models import Q, Count
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Q, Count, Sum
+from django.db.models.functions import NullIf
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+from django.urls import reverse
 from django.utils import timezone
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.units import inch
-import openpyxl
-import random
-from collections import defaultdict
+from django.utils.text import get_valid_filename
+import datetime
+import json
+import tempfile
 from .models import *
 from .forms import *
+from .attendance import (
+    apply_attendance_states, create_session_roster, filter_director_sessions, parse_present_ids,
+    roster_student_ids, save_attendance_changes, session_roster,
+)
+from .jobs import enqueue_job
+from .notifications import queue_absence_alerts
+from .exports import (
+    MissingFilesError, build_attendance_matrix_xlsx, iter_attendance_matrix, matrix_sessions,
+    stream_attendance_matrix_csv, stream_submissions_zip,
+)
+from .intake import enqueue_submission
+from .projects import can_submit_project, visible_projects
+from .roles import role_required
+from .stats import dashboard_stats
+from .students import filiere_facets, search_students
+from .uploads import UPLOAD_CHUNK_SIZE, UploadError, start_upload, write_chunk
+from .pdf import attendance_pdf_filename, cached_attendance_pdf
 
 
 def register(request):
@@ -37,61 +52,57 @@ def register(request):
 
 @login_required
 def dashboard(request):
-    user_profile = getattr(request.user, 'userprofile', None)
-    if not user_profile:
-        # Créer un profil par défaut si il n'existe pas
-        user_profile = UserProfile.objects.create(user=request.user, user_type='student')
-    
-    context = {
-        'user_profile': user_profile,
-    }
-    
-    if user_profile.user_type == 'delegate':
-        context.update({
-            'students_count': Student.objects.count(),
-            'subjects_count': Subject.objects.count(),
-            'groups_count': WorkGroup.objects.filter(created_by=request.user).count(),
-            'recent_sessions': AttendanceSession.objects.filter(created_by=request.user)[:5],
-        })
-    elif user_profile.user_type == 'director':
-        context.update({
-            'total_sessions': AttendanceSession.objects.count(),
-            'pending_comments': AttendanceSession.objects.filter(directorcomment__isnull=True).count(),
-            'recent_sessions': AttendanceSession.objects.all()[:5],
-        })
-    elif user_profile.user_type == 'student':
+    context = {}
+    
+    if not request.role:
+        messages.warning(request, 'Votre profil n\'est pas encore configuré.')
+    
+    context.update(dashboard_stats(request.role, request.user, request.student_pk))
+    
+    if request.role == 'delegate':
+        context['recent_sessions'] = list(
+            AttendanceSession.objects.filter(created_by=request.user).select_related('subject')[:5]
+        )
+    elif request.role == 'director':
+        context['recent_sessions'] = list(
+            AttendanceSession.objects.select_related('subject', 'created_by')[:5]
+        )
+    elif request.role == 'student':
         try:
-            student = Student.objects.get(user=request.user)
-            context.update({
-                'student': student,
-                'my_groups': WorkGroup.objects.filter(students=student),
-                'my_projects': Project.objects.filter(
-                    Q(project_type='individual') | 
-                    Q(work_group__students=student)
-                ).distinct(),
-            })
+            context['student'] = Student.objects.get(pk=request.student_pk)
         except Student.DoesNotExist:
             messages.warning(request, 'Votre profil étudiant n\'est pas encore configuré.')
     
     return render(request, 'core/dashboard.html', context)
 
 
-@login_required
+STUDENTS_PAGE_SIZE = 50
+
+
+@role_required('delegate')
 def students_list(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
-    students = Student.objects.all()
-    return render(request, 'core/students_list.html', {'students': students})
+    query = request.GET.get('q', '').strip()
+    filiere = request.GET.get('filiere', '')
+    
+    students = search_students(Student.objects.all(), query)
+    # Comptes par filière sur la recherche, avant le filtre de filière
+    facets = filiere_facets(students)
+    if filiere:
+        students = students.filter(filiere=filiere)
+    page = Paginator(students, STUDENTS_PAGE_SIZE).get_page(request.GET.get('page'))
+    
+    return render(request, 'core/students_list.html', {
+        'students': page,
+        'page_obj': page,
+        'facets': facets,
+        'total_count': sum(count for _, _, count in facets),
+        'query': query,
+        'filiere': filiere,
+    })
 
 
-@login_required
+@role_required('delegate')
 def add_student(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     if request.method == 'POST':
         form = StudentForm(request.POST)
         if form.is_valid():
@@ -104,99 +115,25 @@ def add_student(request):
     return render(request, 'core/add_student.html', {'form': form})
 
 
-@login_required
+@role_required('delegate')
 def import_students(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     if request.method == 'POST':
         form = ExcelUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            try:
-                excel_file = request.FILES['excel_file']
-                workbook = openpyxl.load_workbook(excel_file)
-                sheet = workbook.active
-                
-                imported_count = 0
-                errors = []
-                
-                for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-                    if not any(row[:4]):  # Skip empty rows
-                        continue
-                    
-                    try:
-                        last_name = str(row[0]).strip() if row[0] else ''
-                        first_name = str(row[1]).strip() if row[1] else ''
-                        filiere = str(row[2]).strip().lower() if row[2] else ''
-                        student_id = str(row[3]).strip() if row[3] else ''
-                        email = str(row[4]).strip() if row[4] and len(row) > 4 else ''
-                        
-                        if not all([last_name, first_name, filiere, student_id]):
-                            errors.append(f"Ligne {row_num}: Données manquantes")
-                            continue
-                        
-                        # Vérifier si la filière existe dans les choix
-                        filiere_choices = dict(Student.FILIERE_CHOICES)
-                        filiere_key = None
-                        for key, value in filiere_choices.items():
-                            if filiere.lower() in [key.lower(), value.lower()]:
-                                filiere_key = key
-                                break
-                        
-                        if not filiere_key:
-                            errors.append(f"Ligne {row_num}: Filière '{filiere}' non reconnue")
-                            continue
-                        
-                        # Créer ou mettre à jour l'étudiant
-                        student, created = Student.objects.get_or_create(
-                            student_id=student_id,
-                            defaults={
-                                'first_name': first_name,
-                                'last_name': last_name,
-                                'filiere': filiere_key,
-                                'email': email,
-                            }
-                        )
-                        
-                        if created:
-                            imported_count += 1
-                        else:
-                            # Mettre à jour les informations existantes
-                            student.first_name = first_name
-                            student.last_name = last_name
-                            student.filiere = filiere_key
-                            student.email = email
-                            student.save()
-                    
-                    except Exception as e:
-                        errors.append(f"Ligne {row_num}: Erreur - {str(e)}")
-                
-                if imported_count > 0:
-                    messages.success(request, f'{imported_count} étudiants importés avec succès!')
-                
-                if errors:
-                    for error in errors[:5]:  # Afficher seulement les 5 premières erreurs
-                        messages.warning(request, error)
-                    if len(errors) > 5:
-                        messages.warning(request, f"... et {len(errors) - 5} autres erreurs")
-                
-                return redirect('students_list')
-            
-            except Exception as e:
-                messages.error(request, f'Erreur lors de l\'importation: {str(e)}')
+            job = enqueue_job(
+                'import_students', request.user,
+                input_file=form.cleaned_data['excel_file'],
+            )
+            messages.info(request, 'Importation lancée en arrière-plan.')
+            return redirect('job_detail', job_id=job.id)
     else:
         form = ExcelUploadForm()
     
     return render(request, 'core/import_students.html', {'form': form})
 
 
-@login_required
+@role_required('delegate')
 def create_groups(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     if request.method == 'POST':
         form = WorkGroupForm(request.POST)
         if form.is_valid():
@@ -204,103 +141,56 @@ def create_groups(request):
             group_size = form.cleaned_data['group_size']
             is_mixed = form.cleaned_data['is_mixed']
             
-            # Supprimer les anciens groupes pour cette matière
-            WorkGroup.objects.filter(subject=subject, created_by=request.user).delete()
-            
-            students = list(Student.objects.all())
-            if not students:
+            if not Student.objects.exists():
                 messages.error(request, 'Aucun étudiant trouvé. Veuillez d\'abord ajouter des étudiants.')
                 return redirect('students_list')
             
-            groups = []
-            
-            if is_mixed:
-                # Groupes mixtes - équilibrer les filières
-                filieres = defaultdict(list)
-                for student in students:
-                    filieres[student.filiere].append(student)
-                
-                # Mélanger chaque filière
-                for filiere_students in filieres.values():
-                    random.shuffle(filiere_students)
-                
-                # Créer les groupes en distribuant équitablement les filières
-                num_groups = len(students) // group_size + (1 if len(students) % group_size > 0 else 0)
-                groups = [[] for _ in range(num_groups)]
-                
-                # Distribuer les étudiants par filière
-                for filiere, filiere_students in filieres.items():
-                    for i, student in enumerate(filiere_students):
-                        group_index = i % num_groups
-                        groups[group_index].append(student)
-            else:
-                # Groupes aléatoires simples
-                random.shuffle(students)
-                for i in range(0, len(students), group_size):
-                    group = students[i:i + group_size]
-                    if group:  # Ne pas créer de groupes vides
-                        groups.append(group)
-            
-            # Créer les groupes dans la base de données
-            for i, group_students in enumerate(groups, 1):
-                if group_students:  # Vérifier que le groupe n'est pas vide
-                    work_group = WorkGroup.objects.create(
-                        name=f"Groupe {i} - {subject.name}",
-                        subject=subject,
-                        created_by=request.user,
-                        is_mixed=is_mixed
-                    )
-                    work_group.students.set(group_students)
-            
-            messages.success(request, f'{len(groups)} groupes créés avec succès pour {subject.name}!')
-            return redirect('groups_list')
+            job = enqueue_job('create_groups', request.user, {
+                'subject_id': subject.id,
+                'group_size': group_size,
+                'is_mixed': is_mixed,
+                'seed': form.cleaned_data['seed'],
+                'keep_apart': form.cleaned_data['keep_apart'],
+                'avoid_previous': form.cleaned_data['avoid_previous'],
+                'mode': form.cleaned_data['mode'],
+            })
+            messages.info(request, f'Création des groupes pour {subject.name} lancée en arrière-plan.')
+            return redirect('job_detail', job_id=job.id)
     else:
         form = WorkGroupForm()
     
     return render(request, 'core/create_groups.html', {'form': form})
 
 
-@login_required
+@role_required('delegate')
 def groups_list(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     groups = WorkGroup.objects.filter(created_by=request.user).prefetch_related('students', 'subject')
     return render(request, 'core/groups_list.html', {'groups': groups})
 
 
-@login_required
+@role_required('delegate')
 def attendance_sessions(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     sessions = AttendanceSession.objects.filter(created_by=request.user).order_by('-date', '-start_time')
     return render(request, 'core/attendance_sessions.html', {'sessions': sessions})
 
 
-@login_required
+@role_required('delegate')
 def create_attendance_session(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     if request.method == 'POST':
         form = AttendanceSessionForm(request.POST)
         if form.is_valid():
             session = form.save(commit=False)
             session.created_by = request.user
-            session.save()
             
-            # Créer les entrées de présence pour tous les étudiants
-            students = Student.objects.all()
-            for student in students:
-                Attendance.objects.create(
-                    session=session,
-                    student=student,
-                    is_present=False
-                )
+            # Créer les entrées de présence pour les étudiants concernés
+            student_ids = roster_student_ids(
+                form.cleaned_data['roster'],
+                filiere=form.cleaned_data['roster_filiere'],
+                work_group=form.cleaned_data['roster_group'],
+            )
+            with transaction.atomic():
+                session.save()
+                create_session_roster(session, student_ids)
             
             messages.success(request, 'Session de présence créée avec succès!')
             return redirect('take_attendance', session_id=session.id)
@@ -310,22 +200,16 @@ def create_attendance_session(request):
     return render(request, 'core/create_attendance_session.html', {'form': form})
 
 
-@login_required
+@role_required('delegate')
 def take_attendance(request, session_id):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'delegate':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
-    session = get_object_or_404(AttendanceSession, id=session_id, created_by=request.user)
+    session = get_object_or_404(AttendanceSession.objects.select_related('subject'), id=session_id, created_by=request.user)
     attendances = Attendance.objects.filter(session=session).select_related('student')
     
     if request.method == 'POST':
-        for attendance in attendances:
-            is_present = request.POST.get(f'present_{attendance.id}') == 'on'
-            attendance.is_present = is_present
-            attendance.save()
+        changed = save_attendance_changes(session, parse_present_ids(request.POST))
+        queue_absence_alerts(session)
         
-        messages.success(request, 'Présences enregistrées avec succès!')
+        messages.success(request, f'Présences enregistrées avec succès! ({changed} modification{"s" if changed > 1 else ""})')
         return redirect('attendance_sessions')
     
     return render(request, 'core/take_attendance.html', {
@@ -334,147 +218,301 @@ def take_attendance(request, session_id):
     })
 
 
-@login_required
-def generate_attendance_pdf(request, session_id):
-    session = get_object_or_404(AttendanceSession, id=session_id)
-    
-    # Vérifier les permissions
-    user_profile = getattr(request.user, 'userprofile', None)
-    if not user_profile or user_profile.user_type not in ['delegate', 'director']:
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
+ROSTER_PAGE_SIZE = 50
+ROSTER_MAX_PAGE_SIZE = 200
+
+
+@role_required('delegate', api=True)
+@require_GET
+def attendance_roster_api(request, session_id):
+    session = get_object_or_404(AttendanceSession, id=session_id, created_by=request.user)
     
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="presence_{session.subject.code}_{session.date}.pdf"'
-    
-    doc = SimpleDocTemplate(response, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Titre
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1,  # Center
-        textColor=colors.darkblue
+    present = request.GET.get('present')
+    attendances = session_roster(
+        session,
+        filiere=request.GET.get('filiere'),
+        search=request.GET.get('q', '').strip(),
+        present={'true': True, 'false': False}.get(present),
     )
     
-    title = f"Liste de Présence - {session.subject.name}"
-    story.append(Paragraph(title, title_style))
+    try:
+        page_size = min(int(request.GET.get('page_size', ROSTER_PAGE_SIZE)), ROSTER_MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = ROSTER_PAGE_SIZE
+    page = Paginator(attendances, max(page_size, 1)).get_page(request.GET.get('page'))
+    
+    return JsonResponse({
+        'count': page.paginator.count,
+        'page': page.number,
+        'num_pages': page.paginator.num_pages,
+        'results': [
+            {
+                'id': attendance.id,
+                'student_id': attendance.student.student_id,
+                'first_name': attendance.student.first_name,
+                'last_name': attendance.student.last_name,
+                'filiere': attendance.student.filiere,
+                'filiere_display': attendance.student.get_filiere_display(),
+                'is_present': attendance.is_present,
+            }
+            for attendance in page
+        ],
+    })
+
+
+@role_required('delegate', api=True)
+@require_POST
+def attendance_toggle_api(request, session_id):
+    session = get_object_or_404(AttendanceSession.objects.select_related('subject'), id=session_id, created_by=request.user)
     
-    # Informations de la session
-    info_style = ParagraphStyle(
-        'InfoStyle',
-        parent=styles['Normal'],
-        fontSize=12,
-        spaceAfter=20
+    # Accepte {"id": 12, "present": true} ou {"changes": [{"id": 12, "present": true}, ...]}
+    try:
+        data = json.loads(request.body)
+        changes = data['changes'] if 'changes' in data else [data]
+        states = {}
+        for change in changes:
+            # Booléen JSON uniquement : bool("false") vaudrait True
+            if not isinstance(change['present'], bool):
+                raise TypeError('present')
+            states[int(change['id'])] = change['present']
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse({'error': 'Requête invalide.'}, status=400)
+    
+    present_ids = [attendance_id for attendance_id, present in states.items() if present]
+    absent_ids = [attendance_id for attendance_id, present in states.items() if not present]
+    changed = apply_attendance_states(session, present_ids, absent_ids)
+    if changed:
+        # Seules les présences pointées sont reprises, sauf au premier enregistrement
+        queue_absence_alerts(session, attendance_ids=list(states))
+    
+    return JsonResponse({'updated': changed})
+
+
+@role_required('delegate', 'director')
+def generate_attendance_pdf(request, session_id):
+    session = get_object_or_404(AttendanceSession.objects.select_related('subject', 'created_by'), id=session_id)
+    
+    # Servir directement le PDF en cache s'il correspond à l'état actuel de la session
+    cached_path = cached_attendance_pdf(session)
+    if cached_path:
+        return FileResponse(
+            open(cached_path, 'rb'),
+            as_attachment=True,
+            filename=attendance_pdf_filename(session),
+            content_type='application/pdf',
+        )
+    
+    job = Job.objects.filter(
+        kind='attendance_pdf', created_by=request.user,
+        status__in=['pending', 'running'], payload__session_id=session.id,
+    ).first()
+    if not job:
+        job = enqueue_job('attendance_pdf', request.user, {'session_id': session.id})
+    return redirect('job_detail', job_id=job.id)
+
+
+@login_required
+def job_detail(request, job_id):
+    job = get_object_or_404(Job, id=job_id, created_by=request.user)
+    return render(request, 'core/job_detail.html', {'job': job})
+
+
+def _job_download_url(job):
+    if job.status != 'done':
+        return None
+    if job.kind == 'attendance_pdf':
+        return reverse('generate_attendance_pdf', args=[job.payload['session_id']])
+    if job.output_file:
+        return reverse('job_download', args=[job.id])
+    return None
+
+
+@login_required
+def job_status(request, job_id):
+    job = get_object_or_404(Job, id=job_id, created_by=request.user)
+    return JsonResponse({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'total': job.total,
+        'result': job.result,
+        'error': job.error.split('\n', 1)[0] if job.error else '',
+        'download_url': _job_download_url(job),
+    })
+
+
+@login_required
+def job_download(request, job_id):
+    job = get_object_or_404(Job, id=job_id, created_by=request.user, status='done')
+    if not job.output_file:
+        raise Http404
+    return FileResponse(
+        job.output_file.open('rb'),
+        as_attachment=True,
+        filename=job.result.get('filename') or job.output_file.name.rsplit('/', 1)[-1],
     )
-    
-    info_text = f"""
-    <b>Matière:</b> {session.subject.name} ({session.subject.code})<br/>
-    <b>Enseignant:</b> {session.subject.teacher}<br/>
-    <b>Date:</b> {session.date.strftime('%d/%m/%Y')}<br/>
-    <b>Horaire:</b> {session.start_time.strftime('%H:%M')} - {session.end_time.strftime('%H:%M')}<br/>
-    <b>Délégué:</b> {session.created_by.get_full_name()}<br/>
-    """
-    
-    story.append(Paragraph(info_text, info_style))
-    story.append(Spacer(1, 20))
-    
-    # Tableau des présences
-    attendances = Attendance.objects.filter(session=session).select_related('student')
-    
-    data = [['#', 'Nom', 'Prénom', 'Filière', 'Présence', 'Signature']]
-    
-    for i, attendance in enumerate(attendances, 1):
-        status = '✓' if attendance.is_present else '✗'
-        data.append([
-            str(i),
-            attendance.student.last_name,
-            attendance.student.first_name,
-            attendance.student.get_filiere_display(),
-            status,
-            ''  # Colonne pour signature
-        ])
-    
-    table = Table(data, colWidths=[0.5*inch, 1.5*inch, 1.5*inch, 1.2*inch, 0.8*inch, 1.5*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-    ]))
-    
-    story.append(table)
-    
-    # Statistiques
-    total_students = attendances.count()
-    present_count = attendances.filter(is_present=True).count()
-    absent_count = total_students - present_count
-    
-    story.append(Spacer(1, 30))
-    stats_text = f"""
-    <b>Statistiques:</b><br/>
-    Total étudiants: {total_students}<br/>
-    Présents: {present_count}<br/>
-    Absents: {absent_count}<br/>
-    Taux de présence: {(present_count/total_students*100):.1f}% si total_students > 0 else 0
-    """
-    
-    story.append(Paragraph(stats_text, info_style))
-    
-    # Notes si présentes
-    if session.notes:
-        story.append(Spacer(1, 20))
-        notes_text = f"<b>Notes:</b><br/>{session.notes}"
-        story.append(Paragraph(notes_text, info_style))
-    
-    doc.build(story)
-    return response
 
 
 # Vues pour le directeur des études
-@login_required
+DIRECTOR_PAGE_SIZE = 25
+
+
+def _filter_director_sessions(request):
+    return filter_director_sessions(request.GET)
+
+
+def _parse_session_cursor(cursor):
+    # Curseur "AAAA-MM-JJ,HH:MM:SS,id" de la dernière session affichée
+    try:
+        date, start_time, session_id = cursor.split(',')
+        return (
+            datetime.date.fromisoformat(date),
+            datetime.time.fromisoformat(start_time),
+            int(session_id),
+        )
+    except (AttributeError, ValueError):
+        return None
+
+
+@role_required('director')
 def director_attendance_list(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'director':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
-    sessions = AttendanceSession.objects.all().order_by('-date', '-start_time')
-    
-    # Filtres
+    # present_count, absent_count et has_comment viennent des compteurs de la session
+    sessions = _filter_director_sessions(request).select_related('subject', 'created_by')
     subject_filter = request.GET.get('subject')
     date_filter = request.GET.get('date')
     
-    if subject_filter:
-        sessions = sessions.filter(subject_id=subject_filter)
-    if date_filter:
-        sessions = sessions.filter(date=date_filter)
+    # Pagination par clé sur (-date, -start_time, id)
+    cursor = _parse_session_cursor(request.GET.get('after'))
+    if cursor:
+        date, start_time, session_id = cursor
+        sessions = sessions.filter(
+            Q(date__lt=date)
+            | Q(date=date, start_time__lt=start_time)
+            | Q(date=date, start_time=start_time, id__gt=session_id)
+        )
+    
+    page = list(sessions[:DIRECTOR_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(page) > DIRECTOR_PAGE_SIZE:
+        page = page[:DIRECTOR_PAGE_SIZE]
+        last = page[-1]
+        next_cursor = f"{last.date.isoformat()},{last.start_time.isoformat()},{last.id}"
     
     subjects = Subject.objects.all()
     
     return render(request, 'core/director_attendance_list.html', {
-        'sessions': sessions,
+        'sessions': page,
+        'next_cursor': next_cursor,
         'subjects': subjects,
         'subject_filter': subject_filter,
         'date_filter': date_filter,
     })
 
 
-@login_required
-def director_add_comment(request, session_id):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'director':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
+REPORT_PAGE_SIZE = 50
+
+
+@role_required('director')
+def director_attendance_report(request):
+    """Taux d'absence par étudiant, lus uniquement dans les bilans (AttendanceSummary)."""
+    subject_filter = request.GET.get('subject', '')
+    filiere_filter = request.GET.get('filiere', '')
+    min_rate = request.GET.get('min_rate', '')
     
+    summaries = AttendanceSummary.objects.all()
+    if subject_filter.isdigit():
+        summaries = summaries.filter(subject_id=subject_filter)
+    if filiere_filter:
+        summaries = summaries.filter(student__filiere=filiere_filter)
+    
+    rows = summaries.values(
+        'student_id', 'student__last_name', 'student__first_name', 'student__student_id', 'student__filiere'
+    ).annotate(
+        n_present=Sum('present'),
+        n_absent=Sum('absent'),
+        n_total=Sum('present') + Sum('absent'),
+        absence_rate=Sum('absent') * 100.0 / NullIf(Sum('present') + Sum('absent'), 0),
+    ).filter(n_total__gt=0).order_by('-absence_rate', 'student__last_name', 'student__first_name')
+    try:
+        rows = rows.filter(absence_rate__gte=float(min_rate))
+    except ValueError:
+        pass
+    
+    page = Paginator(rows, REPORT_PAGE_SIZE).get_page(request.GET.get('page'))
+    filiere_labels = dict(Student.FILIERE_CHOICES)
+    for row in page:
+        row['filiere_label'] = filiere_labels.get(row['student__filiere'], row['student__filiere'])
+    
+    return render(request, 'core/director_attendance_report.html', {
+        'rows': page,
+        'page_obj': page,
+        'subjects': Subject.objects.all(),
+        'filieres': Student.FILIERE_CHOICES,
+        'subject_filter': subject_filter,
+        'filiere_filter': filiere_filter,
+        'min_rate': min_rate,
+    })
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@role_required('director')
+def director_attendance_matrix(request):
+    """Matrice étudiants × séances d'une matière ou d'une filière, en CSV ou XLSX, générée en flux."""
+    subject_filter = request.GET.get('subject', '')
+    subject_id = int(subject_filter) if subject_filter.isdigit() else None
+    filiere = request.GET.get('filiere', '')
+    if filiere not in dict(Student.FILIERE_CHOICES):
+        filiere = None
+    if not subject_id and not filiere:
+        messages.error(request, 'Choisissez une matière ou une filière pour exporter la matrice.')
+        return redirect('director_attendance_report')
+    
+    name = 'presences'
+    if subject_id:
+        name += f'_{get_object_or_404(Subject, id=subject_id).code}'
+    if filiere:
+        name += f'_{filiere}'
+    name = get_valid_filename(name)
+    
+    sessions = matrix_sessions(
+        subject_id, filiere, _parse_date(request.GET.get('date_from')), _parse_date(request.GET.get('date_to'))
+    )
+    matrix = iter_attendance_matrix(sessions, filiere)
+    
+    if request.GET.get('format') == 'xlsx':
+        output = tempfile.TemporaryFile()
+        build_attendance_matrix_xlsx(matrix, output)
+        output.seek(0)
+        return FileResponse(
+            output, as_attachment=True, filename=f'{name}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    
+    response = StreamingHttpResponse(stream_attendance_matrix_csv(matrix), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{name}.csv"'
+    return response
+
+
+@role_required('director')
+def director_attendance_export(request):
+    # Rendu des PDF et assemblage par run_jobs, hors de la requête
+    params = {key: request.GET[key] for key in ('subject', 'date', 'pending') if request.GET.get(key)}
+    export_format = 'pdf' if request.GET.get('format') == 'pdf' else 'zip'
+    job = enqueue_job('attendance_export', request.user, dict(params, format=export_format))
+    messages.info(request, 'Export des listes de présence lancé en arrière-plan.')
+    return redirect('job_detail', job_id=job.id)
+
+
+@role_required('director')
+def director_add_comment(request, session_id):
     session = get_object_or_404(AttendanceSession, id=session_id)
     
     if request.method == 'POST':
@@ -483,7 +521,9 @@ def director_add_comment(request, session_id):
             comment = form.save(commit=False)
             comment.attendance_session = session
             comment.created_by = request.user
-            comment.save()
+            with transaction.atomic():
+                # Le compteur de la session est mis à jour par signal, dans la même transaction
+                comment.save()
             messages.success(request, 'Commentaire ajouté avec succès!')
             return redirect('director_attendance_list')
     else:
@@ -495,16 +535,58 @@ def director_add_comment(request, session_id):
     })
 
 
+@role_required('director')
+def director_projects(request):
+    projects = Project.objects.select_related('subject', 'work_group').annotate(
+        submissions_count=Count('projectsubmission'),
+        validated_count=Count('projectsubmission', filter=Q(projectsubmission__is_validated=True)),
+    ).order_by('-due_date')
+    return render(request, 'core/director_projects.html', {'projects': projects})
+
+
+@role_required('director')
+def director_project_submissions(request, project_id):
+    project = get_object_or_404(Project.objects.select_related('subject', 'work_group'), id=project_id)
+    submissions = ProjectSubmission.objects.filter(project=project)
+    
+    if request.method == 'POST':
+        # Validation groupée : une seule requête UPDATE pour la sélection
+        is_validated = request.POST.get('action') == 'validate'
+        if request.POST.get('select_all'):
+            selected = submissions
+        else:
+            ids = [int(i) for i in request.POST.getlist('submission_ids') if i.isdigit()]
+            selected = submissions.filter(id__in=ids)
+        updated = selected.exclude(is_validated=is_validated).update(is_validated=is_validated)
+        state = 'validée' if is_validated else 'invalidée'
+        messages.success(request, f'{updated} soumission{"s" if updated > 1 else ""} {state}{"s" if updated > 1 else ""}.')
+        return redirect('director_project_submissions', project_id=project.id)
+    
+    return render(request, 'core/director_project_submissions.html', {
+        'project': project,
+        'submissions': submissions.select_related('student').order_by('student__last_name', 'student__first_name'),
+    })
+
+
+@role_required('director')
+def director_project_submissions_zip(request, project_id):
+    project = get_object_or_404(Project.objects.select_related('subject', 'work_group'), id=project_id)
+    try:
+        stream = stream_submissions_zip(project)
+    except MissingFilesError as e:
+        messages.error(request, f'Archive impossible : {len(e.names)} fichier(s) introuvable(s) ({", ".join(e.names[:5])}).')
+        return redirect('director_project_submissions', project_id=project.id)
+    response = StreamingHttpResponse(stream, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="soumissions_{project.id}.zip"'
+    return response
+
+
 # Vues pour les étudiants
-@login_required
+@role_required('student')
 def student_groups(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'student':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     try:
-        student = Student.objects.get(user=request.user)
-        groups = WorkGroup.objects.filter(students=student)
+        student = Student.objects.get(pk=request.student_pk)
+        groups = WorkGroup.objects.filter(students=student).select_related('subject').prefetch_related('students')
         return render(request, 'core/student_groups.html', {
             'student': student,
             'groups': groups
@@ -514,18 +596,11 @@ def student_groups(request):
         return redirect('dashboard')
 
 
-@login_required
+@role_required('student')
 def student_projects(request):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'student':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
     try:
-        student = Student.objects.get(user=request.user)
-        projects = Project.objects.filter(
-            Q(project_type='individual') | 
-            Q(work_group__students=student)
-        ).distinct()
+        student = Student.objects.get(pk=request.student_pk)
+        projects = visible_projects(student.pk)
         
         return render(request, 'core/student_projects.html', {
             'student': student,
@@ -536,25 +611,15 @@ def student_projects(request):
         return redirect('dashboard')
 
 
-@login_required
+@role_required('student')
 def submit_project(request, project_id):
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'student':
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('dashboard')
-    
-    project = get_object_or_404(Project, id=project_id)
+    project = get_object_or_404(Project.objects.select_related('subject'), id=project_id)
     
     try:
-        student = Student.objects.get(user=request.user)
+        student = Student.objects.get(pk=request.student_pk)
         
         # Vérifier si l'étudiant peut soumettre ce projet
-        can_submit = False
-        if project.project_type == 'individual':
-            can_submit = True
-        elif project.work_group and student in project.work_group.students.all():
-            can_submit = True
-        
-        if not can_submit:
+        if not can_submit_project(project, student.pk):
             messages.error(request, 'Vous n\'êtes pas autorisé à soumettre ce projet.')
             return redirect('student_projects')
         
@@ -565,15 +630,18 @@ def submit_project(request, project_id):
         ).first()
         
         if request.method == 'POST':
+            # La place de réception est réservée par SubmissionIntakeMiddleware,
+            # avant que le corps de la requête (le fichier) ne soit lu
             form = ProjectSubmissionForm(request.POST, request.FILES, instance=existing_submission)
             if form.is_valid():
-                submission = form.save(commit=False)
-                submission.project = project
-                submission.student = student
-                submission.save()
-                
+                received_at = enqueue_submission(
+                    project, student, form.cleaned_data['file'], form.cleaned_data['notes']
+                )
                 action = 'mis à jour' if existing_submission else 'soumis'
-                messages.success(request, f'Projet {action} avec succès!')
+                messages.success(
+                    request,
+                    f'Projet {action} avec succès! Reçu le {timezone.localtime(received_at):%d/%m/%Y à %H:%M:%S}.'
+                )
                 return redirect('student_projects')
         else:
             form = ProjectSubmissionForm(instance=existing_submission)
@@ -586,4 +654,72 @@ def submit_project(request, project_id):
         
     except Student.DoesNotExist:
         messages.error(request, 'Profil étudiant non trouvé.')
-        return redirect('dashboard')
\ No newline at end of file
+        return redirect('dashboard')
+
+
+def _upload_status(upload):
+    return {
+        'upload_id': str(upload.id),
+        'offset': upload.received,
+        'size': upload.size,
+        'chunk_size': UPLOAD_CHUNK_SIZE,
+        'completed': upload.is_complete,
+        'sha256': upload.sha256,
+    }
+
+
+@role_required('student', api=True)
+@require_POST
+def upload_start(request, project_id):
+    project = get_object_or_404(Project, id=project_id)
+    if not can_submit_project(project, request.student_pk):
+        return JsonResponse({'error': 'Vous n\'êtes pas autorisé à soumettre ce projet.'}, status=403)
+    
+    try:
+        data = json.loads(request.body)
+        filename = str(data['filename'])
+        size = int(data['size'])
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse({'error': 'Requête invalide.'}, status=400)
+    if size <= 0 or not filename:
+        return JsonResponse({'error': 'Requête invalide.'}, status=400)
+    
+    student = get_object_or_404(Student, pk=request.student_pk)
+    try:
+        upload = start_upload(
+            project, student, filename, size,
+            sha256=data.get('sha256', ''), notes=data.get('notes', ''),
+        )
+    except UploadError as e:
+        return JsonResponse({'error': str(e), 'offset': e.offset}, status=e.status)
+    return JsonResponse(_upload_status(upload))
+
+
+@role_required('student', api=True)
+def upload_status(request, upload_id):
+    upload = get_object_or_404(UploadSession, id=upload_id, student_id=request.student_pk)
+    return JsonResponse(_upload_status(upload))
+
+
+@role_required('student', api=True)
+@require_http_methods(['PUT', 'POST'])
+def upload_chunk(request, upload_id):
+    upload = get_object_or_404(UploadSession, id=upload_id, student_id=request.student_pk)
+    
+    # Décalage fourni par "Content-Range: bytes <début>-<fin>/<total>" ou ?offset=
+    try:
+        content_range = request.headers.get('Content-Range', '')
+        if content_range.startswith('bytes '):
+            offset = int(content_range[6:].split('-', 1)[0])
+        else:
+            offset = int(request.GET['offset'])
+        length = int(request.headers['Content-Length'])
+    except (ValueError, KeyError):
+        return JsonResponse({'error': 'Décalage ou taille manquant.'}, status=400)
+    
+    try:
+        write_chunk(upload, offset, request, length)
+    except UploadError as e:
+        return JsonResponse({'error': str(e), 'offset': e.offset}, status=e.status)
+    
+    return JsonResponse(_upload_status(upload))